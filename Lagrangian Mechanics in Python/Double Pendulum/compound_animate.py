@@ -7,23 +7,12 @@ from scipy.integrate import solve_ivp
 g = 9.81
 
 # our system of differential equations
+# compound_rhs.py is generated by compound_derivation.ipynb, see there for details
+from compound_rhs import double_compound_pend_rhs
+# (compound_mm_rhs.double_compound_pend_mm_rhs takes the same arguments and skips the symbolic solve)
+
 def double_compound_pend_ODE(t, y):
-    theta1 = y[0]
-    theta1_dot = y[1]
-    theta2 = y[2]
-    theta2_dot = y[3]
-
-    # see derivation.ipynb for details
-    # edit 2/15/24: fixed theta1_ddot and theta2_ddot
-    theta1_ddot = (13.5*g*np.sin(theta1) - 4.5*g*np.sin(theta1 + 2*theta2) - 6.0*theta1_dot**2*np.sin(theta2) - 4.5*theta1_dot**2*np.sin(2*theta2) - 12.0*theta1_dot*theta2_dot*np.sin(theta2) - 6.0*theta2_dot**2*np.sin(theta2))/(9.0*np.cos(theta2)**2 - 16.0)
-    theta2_ddot = (-13.5*g*np.sin(theta1) - 13.5*g*np.sin(theta1 - theta2) + 10.5*g*np.sin(theta1 + theta2) + 4.5*g*np.sin(theta1 + 2*theta2) + 30.0*theta1_dot**2*np.sin(theta2) + 9.0*theta1_dot**2*np.sin(2*theta2) + 12.0*theta1_dot*theta2_dot*np.sin(theta2) + 9.0*theta1_dot*theta2_dot*np.sin(2*theta2) + 6.0*theta2_dot**2*np.sin(theta2) + 4.5*theta2_dot**2*np.sin(2*theta2))/(9.0*np.cos(theta2)**2 - 16.0)
-
-    return (
-        theta1_dot,
-        theta1_ddot,
-        theta2_dot,
-        theta2_ddot
-    )
+    return double_compound_pend_rhs(t, y, g)
 
 # solve the ODE
 fps = 30
@@ -54,6 +43,18 @@ ax2.set_ylabel("$\\theta_2$ (rad)")
 
 plt.show()
 
+# %%
+# how loose can the solver tolerance be? the energy T + V should stay constant,
+# see lagrangian_tools/energy.py. fewer right-hand side calls = faster
+import sys
+sys.path.append('..')
+from lagrangian_tools.energy import energy_report
+from compound_rhs import double_compound_pend_energy
+
+for rtol in [1e-3, 1e-4, 1e-6, 1e-8]:
+    sol_rtol = solve_ivp(double_compound_pend_ODE, [0, tfinal], x0, t_eval=sol.t, rtol=rtol, atol=rtol*1e-3)
+    print(f'rtol={rtol:.0e}:', energy_report(sol_rtol, double_compound_pend_energy, args=(g,)))
+
 # %%
 # create an image of the pendulum at a particular state
 import numpy as np
@@ -72,21 +73,15 @@ ax.set_title('Compound Double Pendulum')
 theta1 = 0.2
 theta2 = 0.5
 
-# define coordinate transforms
-Tsa = np.array([[np.cos(theta1), -np.sin(theta1), np.sin(theta1)],
-          [np.sin(theta1), np.cos(theta1), -np.cos(theta1)],
-          [0, 0, 1]])
-Tab = np.array([[np.cos(theta2), -np.sin(theta2), np.sin(theta2)],
-          [np.sin(theta2), np.cos(theta2), -np.cos(theta2)],
-          [0, 0, 1]])
-Tsb = Tsa @ Tab
+# joint positions, see lagrangian_tools/kinematics.py
+import sys
+sys.path.append('..')
+from lagrangian_tools.kinematics import chain_positions
 
-p1 = Tsa @ np.array([0,0,1])
-p2 = Tsb @ np.array([0,0,1])
-
-p0 = (0,0)
-p1 = p1[:2]
-p2 = p2[:2]
+x, y = chain_positions([theta1, theta2])
+p0 = (x[0], y[0])
+p1 = (x[1], y[1])
+p2 = (x[2], y[2])
 
 # circles
 origin = ax.add_patch(plt.Circle( p0, 0.1, fc='k', zorder=3))
@@ -97,13 +92,19 @@ plt.show()
 
 # %%
 # Animate the spring pendulum
-import matplotlib.animation as animation
+import sys
+sys.path.append('..')
+from lagrangian_tools.kinematics import chain_positions
+from lagrangian_tools.render import save_animation
 
 # output of the solver
 theta1_data = sol.y[0]
 theta2_data = sol.y[2]
 t_data = sol.t
 
+# rod ends in every frame, see lagrangian_tools/kinematics.py
+x, y = chain_positions([theta1_data, theta2_data])
+
 # edit: 2/15/24: removed black background to match simple_animate.ipynb
 fig = plt.figure()
 ax = fig.add_subplot(aspect='equal')
@@ -112,133 +113,68 @@ ax.set_ylim(-2.25, 2.25)
 ax.set_yticks([])
 ax.set_xticks([])
 
-theta1 = theta1_data[0]
-theta2 = theta2_data[0]
-
 # circles
-p1 = np.zeros(3)
-p2 = np.zeros(3)
-origin = ax.add_patch(plt.Circle( p0, 0.1, fc='k', zorder=3))
-stick1 = ax.add_line(Line2D( (p0[0],p1[0]), (p0[1],p1[1]), color='r', linewidth=3, zorder=1))
-stick2 = ax.add_line(Line2D( (p1[0],p2[0]), (p1[1],p2[1]), color='b', linewidth=3, zorder=1))
+origin = ax.add_patch(plt.Circle( (0,0), 0.1, fc='k', zorder=3))
+stick1 = ax.add_line(Line2D( x[:2,0], y[:2,0], color='r', linewidth=3, zorder=1))
+stick2 = ax.add_line(Line2D( x[1:,0], y[1:,0], color='b', linewidth=3, zorder=1))
 
 # animate each frame "i"
 def animate(i):
 
-    theta1 = theta1_data[i]
-    theta2 = theta2_data[i]
-    t = t_data[i]
-
-    # update pendulum position
-    Tsa = np.array([[np.cos(theta1), -np.sin(theta1), np.sin(theta1)],
-          [np.sin(theta1), np.cos(theta1), -np.cos(theta1)],
-          [0, 0, 1]])
-    Tab = np.array([[np.cos(theta2), -np.sin(theta2), np.sin(theta2)],
-            [np.sin(theta2), np.cos(theta2), -np.cos(theta2)],
-            [0, 0, 1]])
-    Tsb = Tsa @ Tab
-
-    p1 = Tsa @ np.array([0, 0, 1])
-    p2 = Tsb @ np.array([0, 0, 1])
-
     # update graphics
-    stick1.set_data((0,p1[0]), (0,p1[1]))
-    stick2.set_data((p1[0],p2[0]), (p1[1],p2[1]))
+    stick1.set_data(x[:2,i], y[:2,i])
+    stick2.set_data(x[1:,i], y[1:,i])
 
-# save a video: 30 fps
-ani = animation.FuncAnimation(fig, animate, frames=len(t))
-ffmpeg_writer = animation.FFMpegWriter(fps=fps)
-ani.save('double_compound_pend.gif', writer=ffmpeg_writer)
+# save a video: 30 fps, frames are rendered on every core
+save_animation(fig, animate, len(t), 'double_compound_pend.gif', fps=fps)
 
 # %%
 # now let's simulate 1000 double pendulums at once
 # from progress.bar import Bar
 import numpy as np
-from scipy.integrate import solve_ivp
-import matplotlib.pyplot as plt
-from matplotlib.lines import Line2D
 from matplotlib.colors import hsv_to_rgb
-import matplotlib.animation as animation
 
 # pip install moviepy
 from moviepy.editor import VideoClip
-from moviepy.video.io.bindings import mplfig_to_npimage
+
+# integrate every pendulum together, see lagrangian_tools/ensemble.py
+# and draw them straight into an image, see lagrangian_tools/raster.py
+# the solution is cached on disk, so re-running a cell only re-renders
+import sys
+sys.path.append('..')
+from lagrangian_tools.cache import cached
+from lagrangian_tools.ensemble import solve_ensemble
+from lagrangian_tools.kinematics import chain_positions
+from lagrangian_tools.raster import Framebuffer, to_rgb8
 
 N = 1000
 tfinal = 15
 fps = 30
 num_frames = tfinal*fps + 1
 
-class DoublePend():
-    def __init__(self, x0):
-        self.x0 = x0
-
-    def simulate(self, tfinal=30, num_frames=901):
-        sol = solve_ivp(double_compound_pend_ODE, [0, tfinal], self.x0, t_eval=np.linspace(0,tfinal,num_frames))
-        self.theta1 = sol.y[0]
-        self.theta2 = sol.y[2]
-        self.t = sol.t
-
-    def assign_handles(self, stick1, stick2):
-        self.stick1 = stick1
-        self.stick2 = stick2
-
-    def update_handles(self, i):
-        # "i" is the frame number
-        theta1 = self.theta1[i]
-        theta2 = self.theta2[i]
-
-        Tsa = np.array([[np.cos(theta1), -np.sin(theta1), np.sin(theta1)],
-          [np.sin(theta1), np.cos(theta1), -np.cos(theta1)],
-          [0, 0, 1]])
-        Tab = np.array([[np.cos(theta2), -np.sin(theta2), np.sin(theta2)],
-                [np.sin(theta2), np.cos(theta2), -np.cos(theta2)],
-                [0, 0, 1]])
-        Tsb = Tsa @ Tab
-
-        p1 = Tsa @ np.array([0, 0, 1])
-        p2 = Tsb @ np.array([0, 0, 1])
-
-        self.stick1.set_data((0,p1[0]), (0,p1[1]))
-        self.stick2.set_data((p1[0],p2[0]), (p1[1],p2[1]))
-
-
 # create N double pendulums
-pends = [DoublePend(x0=np.array([np.pi/3, 0, np.pi/2+np.deg2rad(0.5)*i/N, 0])) for i in range(N)]
-for pend in pends:
-    pend.simulate(tfinal=tfinal, num_frames=num_frames)
-
-fig = plt.figure()
-ax = fig.add_subplot(aspect='equal')
-ax.figure.set_size_inches(1920/100, 1080/100)
-ax.figure.set_dpi(100)
-ax.figure.set_facecolor('k')
-ax.figure.set_edgecolor('k')
-ax.set_xlim(-19.2/7, 19.2/7)
-ax.set_ylim(-10.8/7-0.8, 10.8/7-0.8)
-ax.set_yticks([])
-ax.set_xticks([])
+print('Simulating 1000 double pendulums...',end='')
+x0 = np.array([[np.pi/3, 0, np.pi/2+np.deg2rad(0.5)*i/N, 0] for i in range(N)])
+sol = cached(solve_ensemble, double_compound_pend_ODE, np.linspace(0,tfinal,num_frames), x0)
+# rod ends of every pendulum, frame-major: x[:, i] is frame "i"
+x, y = chain_positions([sol.y[:,0].T, sol.y[:,2].T])
+print('done!')
+print('Creating video...')
 
-origin = ax.add_patch(plt.Circle( (0,0), 0.01, fc='k', zorder=3))
-background = ax.add_patch(plt.Rectangle( (-10,-10), 20, 20, fc='k', zorder=0))
+# 1920x1080 frame around the pivot
+fb = Framebuffer(1920, 1080, xlim=(-19.2/7, 19.2/7), ylim=(-10.8/7-0.8, 10.8/7-0.8))
 
-for i,pend in enumerate(pends):
-    rainbow_color = hsv_to_rgb((i/N,1,1))
-    stick1 = ax.add_line(Line2D( (0,0), (0,0), color=rainbow_color, linewidth=0.5, zorder=1))
-    stick2 = ax.add_line(Line2D( (0,0), (0,0), color=rainbow_color, linewidth=0.5, zorder=1))
-    pend.assign_handles(stick1, stick2)
+# colors
+rainbow_color = to_rgb8(hsv_to_rgb([(i/N,1,1) for i in range(N)]))
 
-# animate each frame "i"
-frame_number = 0
+# draw frame "i" of every pendulum at once
 def make_frame(t):
+    i = min(round(t*fps), num_frames-1)
 
-    global frame_number
-
-    for pend in pends:
-        pend.update_handles(frame_number)
-        
-    frame_number += 1
-    return mplfig_to_npimage(fig)
+    # both rods of every pendulum
+    fb.clear()
+    fb.draw_segments(x[:-1,i].ravel(), y[:-1,i].ravel(), x[1:,i].ravel(), y[1:,i].ravel(), np.r_[rainbow_color, rainbow_color])
+    return fb.image
 
 animation = VideoClip(make_frame, duration=tfinal)
 animation.write_videofile(f'{N}_compound_pendulums.mp4', fps=fps)
@@ -246,93 +182,91 @@ animation.write_videofile(f'{N}_compound_pendulums.mp4', fps=fps)
 # %%
 # slow motion pendulum (0.25 speed)
 import numpy as np
-from scipy.integrate import solve_ivp
-import matplotlib.pyplot as plt
-from matplotlib.lines import Line2D
 from matplotlib.colors import hsv_to_rgb
-import matplotlib.animation as animation
 
 # pip install moviepy
 from moviepy.editor import VideoClip
-from moviepy.video.io.bindings import mplfig_to_npimage
+
+# integrate every pendulum together, see lagrangian_tools/dense.py
+# and draw them straight into an image, see lagrangian_tools/raster.py
+# the solution is cached on disk, so re-running a cell only re-renders
+import sys
+sys.path.append('..')
+from lagrangian_tools.cache import cached
+from lagrangian_tools.dense import dense_ensemble
+from lagrangian_tools.kinematics import chain_positions
+from lagrangian_tools.raster import Framebuffer, to_rgb8
 
 N = 1000
 tfinal = 10
 speed = 0.25
 fps = 30
-num_frames = 1 + int(tfinal*fps/speed)
-
-class DoublePend():
-    def __init__(self, x0):
-        self.x0 = x0
-
-    def simulate(self, tfinal=30, num_frames=901):
-        sol = solve_ivp(double_compound_pend_ODE, [0, tfinal], self.x0, t_eval=np.linspace(0,tfinal,num_frames))
-        self.theta1 = sol.y[0]
-        self.theta2 = sol.y[2]
-        self.t = sol.t
 
-    def assign_handles(self, stick1, stick2):
-        self.stick1 = stick1
-        self.stick2 = stick2
-
-    def update_handles(self, i):
-        # "i" is the frame number
-        theta1 = self.theta1[i]
-        theta2 = self.theta2[i]
-
-        Tsa = np.array([[np.cos(theta1), -np.sin(theta1), np.sin(theta1)],
-          [np.sin(theta1), np.cos(theta1), -np.cos(theta1)],
-          [0, 0, 1]])
-        Tab = np.array([[np.cos(theta2), -np.sin(theta2), np.sin(theta2)],
-                [np.sin(theta2), np.cos(theta2), -np.cos(theta2)],
-                [0, 0, 1]])
-        Tsb = Tsa @ Tab
-
-        p1 = Tsa @ np.array([0, 0, 1])
-        p2 = Tsb @ np.array([0, 0, 1])
-
-        self.stick1.set_data((0,p1[0]), (0,p1[1]))
-        self.stick2.set_data((p1[0],p2[0]), (p1[1],p2[1]))
+# create N double pendulums
+print('Simulating 1000 double pendulums...',end='')
+x0 = np.array([[np.pi/3, 0, np.pi/2+np.deg2rad(0.5)*i/N, 0] for i in range(N)])
+# RK4 steps of 1/480 s, 4 per frame at 0.25 speed like solve_ensemble takes.
+# the frames are interpolated from them afterwards, so changing fps or
+# (raising) speed doesn't integrate again
+dense = cached(dense_ensemble, double_compound_pend_ODE, [0, tfinal], x0, h=1/480)
+sol = dense.sample(fps, speed)
+num_frames = len(sol.t)
+# rod ends of every pendulum, frame-major: x[:, i] is frame "i"
+x, y = chain_positions([sol.y[:,0].T, sol.y[:,2].T])
+print('done!')
+print('Creating video...')
+
+# 1920x1080 frame around the pivot
+fb = Framebuffer(1920, 1080, xlim=(-19.2/7, 19.2/7), ylim=(-10.8/7-0.8, 10.8/7-0.8))
+
+# colors
+rainbow_color = to_rgb8(hsv_to_rgb([(i/N,1,1) for i in range(N)]))
+
+# draw frame "i" of every pendulum at once
+def make_frame(t):
+    i = min(round(t*fps), num_frames-1)
 
+    # both rods of every pendulum
+    fb.clear()
+    fb.draw_segments(x[:-1,i].ravel(), y[:-1,i].ravel(), x[1:,i].ravel(), y[1:,i].ravel(), np.r_[rainbow_color, rainbow_color])
+    return fb.image
 
-# create N double pendulums
-pends = [DoublePend(x0=np.array([np.pi/3, 0, np.pi/2+np.deg2rad(0.5)*i/N, 0])) for i in range(N)]
-for pend in pends:
-    pend.simulate(tfinal=tfinal, num_frames=num_frames)
+animation = VideoClip(make_frame, duration=tfinal/speed) # 10 * 4 seconds
+animation.write_videofile(f'{N}_compound_pendulum_slow.mp4', fps=fps) # 30 fps
 
-fig = plt.figure()
-ax = fig.add_subplot(aspect='equal')
-ax.figure.set_size_inches(1920/100, 1080/100)
-ax.figure.set_dpi(100)
-ax.figure.set_facecolor('k')
-ax.figure.set_edgecolor('k')
-ax.set_xlim(-19.2/7, 19.2/7)
-ax.set_ylim(-10.8/7-0.8, 10.8/7-0.8)
-ax.set_yticks([])
-ax.set_xticks([])
 
-origin = ax.add_patch(plt.Circle( (0,0), 0.01, fc='k', zorder=3))
-background = ax.add_patch(plt.Rectangle( (-10,-10), 20, 20, fc='k', zorder=0))
 
-for i,pend in enumerate(pends):
-    rainbow_color = hsv_to_rgb((i/N,1,1))
-    stick1 = ax.add_line(Line2D( (0,0), (0,0), color=rainbow_color, linewidth=0.5, zorder=1))
-    stick2 = ax.add_line(Line2D( (0,0), (0,0), color=rainbow_color, linewidth=0.5, zorder=1))
-    pend.assign_handles(stick1, stick2)
+# %%
+# a long video of 1000 double pendulums, streamed: each window of frames is
+# drawn and encoded as soon as it is integrated, so memory doesn't grow with
+# tfinal or N. see lagrangian_tools/ensemble.py and lagrangian_tools/render.py
+import numpy as np
+from matplotlib.colors import hsv_to_rgb
 
-frame_number = 0
-def make_frame(t):
+import sys
+sys.path.append('..')
+from lagrangian_tools.ensemble import iter_ensemble
+from lagrangian_tools.kinematics import chain_positions
+from lagrangian_tools.raster import Framebuffer, to_rgb8
+from lagrangian_tools.render import write_video
 
-    global frame_number
+N = 1000
+tfinal = 600 # 10 minutes
+fps = 30
 
-    for pend in pends:
-        pend.update_handles(frame_number)
-        
-    frame_number += 1
-    return mplfig_to_npimage(fig)
+x0 = np.array([[np.pi/3, 0, np.pi/2+np.deg2rad(0.5)*i/N, 0] for i in range(N)])
+chunks = iter_ensemble(double_compound_pend_ODE, np.linspace(0,tfinal,tfinal*fps+1), x0, chunk_size=fps)
 
-animation = VideoClip(make_frame, duration=tfinal/speed) # 10 * 4 seconds
-animation.write_videofile(f'{N}_compound_pendulum_slow.mp4', fps=fps) # 30 fps
+fb = Framebuffer(1920, 1080, xlim=(-19.2/7, 19.2/7), ylim=(-10.8/7-0.8, 10.8/7-0.8))
+rainbow_color = to_rgb8(hsv_to_rgb([(i/N,1,1) for i in range(N)]))
 
+# draw every frame of every chunk, one at a time
+def frames():
+    for t, states in chunks:
+        x, y = chain_positions([states[:,0].T, states[:,2].T])
+        for i in range(len(t)):
+            fb.clear()
+            fb.draw_segments(x[:-1,i].ravel(), y[:-1,i].ravel(), x[1:,i].ravel(), y[1:,i].ravel(), np.r_[rainbow_color, rainbow_color])
+            yield fb.image
 
+write_video(frames(), f'{N}_compound_pendulums_long.mp4', fps=fps)
@@ -4,6 +4,11 @@ from sympy import *
 from sympy.physics.mechanics import *
 init_vprinting()
 
+# the slow simplify/solve steps are cached on disk, see lagrangian_tools/cache.py
+import sys
+sys.path.append('..')
+from lagrangian_tools.cache import cached_sympy
+
 # %%
 # define our symbolic variables
 m1, m2, L1, L2, g, t = symbols('m1 m2 L1 L2 g t')
@@ -50,25 +55,44 @@ V = m1*g*p1[1] + m2*g*p2[1]
 
 # Lagrangian
 L = T - V
-L = simplify(L) # failure to simplify often may result in no solution
+L = cached_sympy(simplify, L) # failure to simplify often may result in no solution
 
-# solve the Euler-Lagrange Equations
+# the Euler-Lagrange Equations
 eqn_1 = diff( diff(L,theta1_dot), t) - diff(L, theta1)
 eqn_2 = diff( diff(L,theta2_dot), t) - diff(L, theta2)
-eqn_1 = simplify(eqn_1)
-eqn_2 = simplify(eqn_2)
-sln = solve([eqn_1, eqn_2], [theta1_ddot,theta2_ddot])
+eqn_1 = cached_sympy(simplify, eqn_1)
+eqn_2 = cached_sympy(simplify, eqn_2)
+
+# %%
+# solve the Euler-Lagrange Equations for theta1_ddot, theta2_ddot
+sln = cached_sympy(solve, [eqn_1, eqn_2], [theta1_ddot,theta2_ddot])
 
-sln[theta1_ddot] = simplify(sln[theta1_ddot])
-sln[theta2_ddot] = simplify(sln[theta2_ddot])
+sln[theta1_ddot] = cached_sympy(simplify, sln[theta1_ddot])
+sln[theta2_ddot] = cached_sympy(simplify, sln[theta2_ddot])
 
 sln
 
 # %%
-# make it easy to copy and paste into a python script
-g = Matrix([sln[theta1_ddot], sln[theta2_ddot]]).subs({theta1: 'theta1', theta1_dot: 'theta1_dot',theta2: 'theta2', theta2_dot: 'theta2_dot'})
-print(f'theta1_ddot = {g[0]}'.replace('sin', 'np.sin').replace('cos', 'np.cos'))
-print(f'theta2_ddot = {g[1]}'.replace('sin', 'np.sin').replace('cos', 'np.cos'))
-print()
-
+# generate compound_rhs.py, the ODE used by compound_animate.py, the energies (T, V)
+# to check a solution with, and the variational equations used by ftle_map.py
+import sys
+sys.path.append('..')
+from lagrangian_tools.codegen import expression_source, ode_source, variational_source, write_module
+
+f = Matrix([theta1_dot, sln[theta1_ddot], theta2_dot, sln[theta2_ddot]])
+x = Matrix([theta1, theta1_dot, theta2, theta2_dot])
+write_module('compound_rhs.py', [
+    ode_source('double_compound_pend_rhs', f, x, params=[g]),
+    expression_source('double_compound_pend_energy', [T, V], x, params=[g]),
+    variational_source('double_compound_pend_variational', f, x, params=[g]),
+], generated_by='compound_derivation.py')
 
+# %%
+# or skip the solve above: generate compound_mm_rhs.py, which leaves the equations as
+# M(q)*q_ddot = F(q, q_dot) and solves them numerically at every call
+import sys
+sys.path.append('..')
+from lagrangian_tools.codegen import mass_matrix_source, write_module
+
+x = Matrix([theta1, theta1_dot, theta2, theta2_dot])
+write_module('compound_mm_rhs.py', [mass_matrix_source('double_compound_pend_mm_rhs', [eqn_1, eqn_2], x, params=[g])], generated_by='compound_derivation.py')
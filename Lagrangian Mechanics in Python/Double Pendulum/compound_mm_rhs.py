@@ -0,0 +1,27 @@
+# generated by compound_derivation.py, do not edit by hand.
+# re-run the derivation to update this file.
+import numpy as np
+
+
+def double_compound_pend_mm_rhs(t, y, g):
+    theta1, theta1_dot, theta2, theta2_dot = y
+    x0 = np.cos(theta2)
+    x1 = 0.5*x0 + 0.333333333333333
+    x2 = np.sin(theta2)
+    x3 = 0.5*g*np.sin(theta1 + theta2)
+    shape = np.shape(theta1)
+    M = np.empty(shape + (2, 2))
+    M[..., 0, 0] = 1.0*x0 + 1.66666666666667
+    M[..., 0, 1] = x1
+    M[..., 1, 0] = x1
+    M[..., 1, 1] = 0.333333333333333
+    F = np.empty(shape + (2,))
+    F[..., 0] = -1.5*g*np.sin(theta1) + 1.0*theta1_dot*theta2_dot*x2 + 0.5*theta2_dot**2*x2 - x3
+    F[..., 1] = -0.5*theta1_dot**2*x2 - x3
+    q_ddot = np.linalg.solve(M, F[..., None])[..., 0]
+    return (
+        theta1_dot,
+        q_ddot[..., 0],
+        theta2_dot,
+        q_ddot[..., 1],
+    )
@@ -0,0 +1,102 @@
+# generated by compound_derivation.py, do not edit by hand.
+# re-run the derivation to update this file.
+import numpy as np
+
+
+def double_compound_pend_rhs(t, y, g):
+    theta1, theta1_dot, theta2, theta2_dot = y
+    x0 = (9.0*np.cos(theta2)**2 - 16.0)**(-1.0)
+    x1 = theta1_dot**2
+    x2 = np.sin(theta2)
+    x3 = 6.0*x2
+    x4 = 2*theta2
+    x5 = np.sin(x4)
+    x6 = 4.5*x5
+    x7 = theta2_dot**2
+    x8 = 13.5*g
+    x9 = theta1_dot*theta2_dot
+    x10 = 4.5*g*np.sin(theta1 + x4) + 12.0*x2*x9 + x3*x7 - x8*np.sin(theta1)
+    x11 = 9.0*x5
+    return (
+        theta1_dot,
+        x0*(-x1*x3 - x1*x6 - x10),
+        theta2_dot,
+        x0*(10.5*g*np.sin(theta1 + theta2) + x1*x11 + 30.0*x1*x2 + x10 + x11*x9 + x6*x7 - x8*np.sin(theta1 - theta2)),
+    )
+
+
+def double_compound_pend_energy(t, y, g):
+    theta1, theta1_dot, theta2, theta2_dot = y
+    x0 = theta1_dot**2
+    x1 = np.sin(theta1)
+    x2 = 0.125*x0
+    x3 = np.cos(theta1)
+    x4 = 1.0*x3
+    x5 = theta1_dot*x1
+    x6 = np.sin(theta2)
+    x7 = 0.5*x6
+    x8 = np.cos(theta2)
+    x9 = 0.5*x3
+    x10 = x8*x9
+    x11 = 0.5*x8
+    x12 = x3*x7
+    return (
+        0.0416666666666667*x0 + x1**2*x2 + x2*x3**2 + 0.0416666666666667*(theta1_dot + theta2_dot)**2 + 0.5*(theta1_dot*x10 + theta1_dot*x4 - theta2_dot*x1*x7 + theta2_dot*x10 - x5*x7)**2 + 0.5*(theta1_dot*x12 + theta2_dot*x1*x11 + theta2_dot*x12 + x11*x5 + 1.0*x5)**2,
+        -g*x9 + g*(0.5*x1*x6 - x10 - x4),
+    )
+
+
+def double_compound_pend_variational(t, y, g):
+    theta1, theta1_dot, theta2, theta2_dot, delta_theta1, delta_theta1_dot, delta_theta2, delta_theta2_dot = y
+    x0 = np.cos(theta2)
+    x1 = 9.0*x0**2 - 16.0
+    x2 = x1**(-1.0)
+    x3 = theta1_dot**2
+    x4 = np.sin(theta2)
+    x5 = 6.0*x4
+    x6 = 2*theta2
+    x7 = np.sin(x6)
+    x8 = 4.5*x7
+    x9 = theta2_dot**2
+    x10 = theta1 + x6
+    x11 = 4.5*g
+    x12 = 13.5*g
+    x13 = 12.0*x4
+    x14 = theta1_dot*x13
+    x15 = theta2_dot*x14 + x11*np.sin(x10) - x12*np.sin(theta1) + x5*x9
+    x16 = -x15 - x3*x5 - x3*x8
+    x17 = 9.0*x3
+    x18 = 30.0*x3
+    x19 = theta1 + theta2
+    x20 = 10.5*g
+    x21 = theta1 - theta2
+    x22 = 9.0*x7
+    x23 = theta1_dot*x22
+    x24 = theta2_dot*x23 - x12*np.sin(x21) + x15 + x17*x7 + x18*x4 + x20*np.sin(x19) + x8*x9
+    x25 = theta2_dot*x13
+    x26 = x14 + x25
+    x27 = delta_theta2_dot*x2
+    x28 = np.cos(x10)
+    x29 = -x11*x28 + x12*np.cos(theta1)
+    x30 = delta_theta1*x2
+    x31 = x23 + x26
+    x32 = delta_theta1_dot*x2
+    x33 = 6.0*x0
+    x34 = np.cos(x6)
+    x35 = theta1_dot*theta2_dot
+    x36 = 9.0*g*x28 + 12.0*x0*x35 + x33*x9
+    x37 = 18.0*x0*x4/x1**2
+    x38 = theta2_dot*x22
+    x39 = x12*np.cos(x21)
+    x40 = np.cos(x19)
+    x41 = 18.0*x34
+    return (
+        theta1_dot,
+        x16*x2,
+        theta2_dot,
+        x2*x24,
+        delta_theta1_dot,
+        delta_theta2*(x16*x37 + x2*(-x17*x34 - x3*x33 - x36)) - x26*x27 + x29*x30 - x31*x32,
+        delta_theta2_dot,
+        delta_theta2*(x2*(x0*x18 + x20*x40 + x3*x41 + 9.0*x34*x9 + x35*x41 + x36 + x39) + x24*x37) + x27*(x31 + x38) + x30*(10.5*g*x40 - x29 - x39) + x32*(60.0*theta1_dot*x4 + 18.0*theta1_dot*x7 + x25 + x38),
+    )
@@ -0,0 +1,49 @@
+# Flip-time map: release the double pendulum at rest from every (theta1,
+# theta2) of a grid and color it by the time until either rod first flips
+# over the top. Uses every core, see lagrangian_tools/flip.py
+import sys
+import numpy as np
+import matplotlib.pyplot as plt
+
+from simple_rhs import simple_double_pend_rhs, simple_double_pend_energy
+from compound_rhs import double_compound_pend_rhs, double_compound_pend_energy
+
+sys.path.append('..')
+from lagrangian_tools.flip import flip_map
+
+# assign constants
+g = 9.81
+
+# 'simple' or 'compound'
+pendulum = 'compound'
+rhs, energy = {
+    'simple': (simple_double_pend_rhs, simple_double_pend_energy),
+    'compound': (double_compound_pend_rhs, double_compound_pend_energy),
+}[pendulum]
+
+# the grid: 2000 x 2000 starting angles, watched for up to tfinal seconds.
+# the results go to a .npy file tile by tile, and re-running the script
+# picks up where it stopped, unless a setting changed (then it starts over).
+# lower resolution for a quick look
+resolution = 2000
+theta1_values = np.linspace(-np.pi, np.pi, resolution)
+theta2_values = np.linspace(-np.pi, np.pi, resolution)
+tfinal = 10
+
+if __name__ == '__main__': # worker processes import this file on Windows
+    times = flip_map(rhs, theta1_values, theta2_values, tfinal, args=(g,), energy=energy,
+        filename=f'flip_times_{pendulum}.npy')
+
+    # quick flips bright, slow ones dark, never (within tfinal) black. rods
+    # that start upright flip at 0 and get the brightest color
+    colors = plt.get_cmap('inferno')(np.log(np.maximum(times, 1/120)/tfinal)/np.log(1/120/tfinal))
+    colors[~np.isfinite(times)] = (0, 0, 0, 1)
+
+    # theta1 across, theta2 up
+    image = colors.transpose(1, 0, 2)[::-1]
+    plt.imsave(f'flip_map_{pendulum}.png', image)
+    plt.imshow(image, extent=(-np.pi, np.pi, -np.pi, np.pi))
+    plt.xlabel('$\\theta_1$ (rad)')
+    plt.ylabel('$\\theta_2$ (rad)')
+    plt.title(f'Double Pendulum ({pendulum}): Time to Flip')
+    plt.show()
@@ -0,0 +1,47 @@
+# Map of how chaotic the double pendulum is for every starting angle: the
+# finite-time Lyapunov exponent over a grid of (theta1, theta2), released at
+# rest. Uses every core, see lagrangian_tools/lyapunov.py
+import sys
+import numpy as np
+import matplotlib.pyplot as plt
+
+from simple_rhs import simple_double_pend_variational
+from compound_rhs import double_compound_pend_variational
+
+sys.path.append('..')
+from lagrangian_tools.lyapunov import ftle
+from lagrangian_tools.sweep import grid
+
+# assign constants
+g = 9.81
+
+# 'simple' or 'compound'
+pendulum = 'compound'
+variational = {
+    'simple': simple_double_pend_variational,
+    'compound': double_compound_pend_variational,
+}[pendulum]
+
+# the grid: 1000 x 1000 starting angles. every point is integrated for tfinal
+# seconds, so the run time grows with resolution**2 * tfinal (a few minutes
+# per core at these settings). lower resolution for a quick look
+resolution = 1000
+theta1_values = np.linspace(-np.pi, np.pi, resolution)
+theta2_values = np.linspace(-np.pi, np.pi, resolution)
+theta1, theta2 = grid(theta1_values, theta2_values)
+x0 = np.stack([theta1, np.zeros_like(theta1), theta2, np.zeros_like(theta2)], axis=1)
+
+tfinal = 10
+
+if __name__ == '__main__': # worker processes import this file on Windows
+    lam = ftle(variational, x0, tfinal, args=(g,)).reshape(resolution, resolution)
+    np.save(f'ftle_{pendulum}.npy', lam)
+
+    # theta1 across, theta2 up
+    plt.imshow(lam.T, origin='lower', extent=(-np.pi, np.pi, -np.pi, np.pi), cmap='magma')
+    plt.colorbar(label='FTLE (1/s)')
+    plt.xlabel('$\\theta_1$ (rad)')
+    plt.ylabel('$\\theta_2$ (rad)')
+    plt.title(f'Double Pendulum ({pendulum}): Lyapunov Exponent After {tfinal} s')
+    plt.savefig(f'ftle_{pendulum}.png', dpi=200)
+    plt.show()
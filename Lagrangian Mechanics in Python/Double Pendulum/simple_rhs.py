@@ -0,0 +1,97 @@
+# generated by simple_derivation.py, do not edit by hand.
+# re-run the derivation to update this file.
+import numpy as np
+
+
+def simple_double_pend_rhs(t, y, g):
+    theta1, theta1_dot, theta2, theta2_dot = y
+    x0 = (np.cos(theta2)**2 - 2.0)**(-1.0)
+    x1 = theta1_dot**2
+    x2 = 2*theta2
+    x3 = np.sin(x2)
+    x4 = 0.5*x3
+    x5 = np.sin(theta2)
+    x6 = 1.0*x5
+    x7 = theta2_dot**2
+    x8 = theta1_dot*theta2_dot
+    x9 = -1.5*g*np.sin(theta1) + 0.5*g*np.sin(theta1 + x2) + 2.0*x5*x8 + x6*x7
+    x10 = 1.0*g
+    x11 = 1.0*x3
+    return (
+        theta1_dot,
+        x0*(-x1*x4 - x1*x6 - x9),
+        theta2_dot,
+        x0*(x1*x11 + 3.0*x1*x5 - x10*np.sin(theta1 - theta2) + x10*np.sin(theta1 + theta2) + x11*x8 + x4*x7 + x9),
+    )
+
+
+def simple_double_pend_energy(t, y, g):
+    theta1, theta1_dot, theta2, theta2_dot = y
+    x0 = np.sin(theta1)
+    x1 = 0.5*theta1_dot**2
+    x2 = np.cos(theta1)
+    x3 = theta1_dot*x0
+    x4 = np.cos(theta2)
+    x5 = np.sin(theta2)
+    x6 = theta1_dot*x2
+    x7 = x2*x4
+    return (
+        x0**2*x1 + x1*x2**2 + 0.5*(theta2_dot*x0*x4 + theta2_dot*x2*x5 + x3*x4 + x3 + x5*x6)**2 + 0.5*(-theta2_dot*x0*x5 + theta2_dot*x7 - x3*x5 + x4*x6 + x6)**2,
+        -g*x2 + g*(x0*x5 - x2 - x7),
+    )
+
+
+def simple_double_pend_variational(t, y, g):
+    theta1, theta1_dot, theta2, theta2_dot, delta_theta1, delta_theta1_dot, delta_theta2, delta_theta2_dot = y
+    x0 = np.cos(theta2)
+    x1 = x0**2 - 2.0
+    x2 = x1**(-1.0)
+    x3 = theta1_dot**2
+    x4 = 2*theta2
+    x5 = np.sin(x4)
+    x6 = 0.5*x5
+    x7 = np.sin(theta2)
+    x8 = 1.0*x7
+    x9 = theta1 + x4
+    x10 = 0.5*g
+    x11 = theta2_dot**2
+    x12 = 1.5*g
+    x13 = 2.0*x7
+    x14 = theta1_dot*x13
+    x15 = theta2_dot*x14 + x10*np.sin(x9) + x11*x8 - x12*np.sin(theta1)
+    x16 = -x15 - x3*x6 - x3*x8
+    x17 = theta1 + theta2
+    x18 = 1.0*g
+    x19 = 1.0*x3
+    x20 = 3.0*x3
+    x21 = theta1 - theta2
+    x22 = 1.0*x5
+    x23 = theta1_dot*x22
+    x24 = theta2_dot*x23 + x11*x6 + x15 + x18*np.sin(x17) - x18*np.sin(x21) + x19*x5 + x20*x7
+    x25 = theta2_dot*x13
+    x26 = x14 + x25
+    x27 = delta_theta2_dot*x2
+    x28 = np.cos(x9)
+    x29 = -x10*x28 + x12*np.cos(theta1)
+    x30 = delta_theta1*x2
+    x31 = x23 + x26
+    x32 = delta_theta1_dot*x2
+    x33 = np.cos(x4)
+    x34 = 1.0*x11
+    x35 = 2.0*theta1_dot
+    x36 = theta2_dot*x0*x35 + x0*x34 + x18*x28
+    x37 = 2*x0*x7/x1**2
+    x38 = theta2_dot*x22
+    x39 = x18*np.cos(x21)
+    x40 = np.cos(x17)
+    x41 = 2.0*x33
+    return (
+        theta1_dot,
+        x16*x2,
+        theta2_dot,
+        x2*x24,
+        delta_theta1_dot,
+        delta_theta2*(x16*x37 + x2*(-x0*x19 - x19*x33 - x36)) - x26*x27 + x29*x30 - x31*x32,
+        delta_theta2_dot,
+        delta_theta2*(x2*(theta1_dot*theta2_dot*x41 + x0*x20 + x18*x40 + x3*x41 + x33*x34 + x36 + x39) + x24*x37) + x27*(x31 + x38) + x30*(1.0*g*x40 - x29 - x39) + x32*(6.0*theta1_dot*x7 + x25 + x35*x5 + x38),
+    )
@@ -14,19 +14,12 @@ ell_0 = 1 # resting length of spring
 x0 = np.array([np.deg2rad(15), 0, 0.25, 0])
 
 # our system of differential equations
-# see "derivation.ipynb" for details
+# elastic_rhs.py is generated by "derivation.ipynb", see there for details
+from elastic_rhs import elastic_pend_rhs
+# (elastic_mm_rhs.elastic_pend_mm_rhs takes the same arguments and skips the symbolic solve)
+
 def spring_mass_ODE(t, y):
-    theta = y[0]
-    theta_dot = y[1]
-    ell = y[2]
-    ell_dot = y[3]
-
-    return (
-        theta_dot,
-        (-2.0*ell_dot*theta_dot - g*np.sin(theta))/(ell + ell_0),
-        ell_dot,
-        -ell*k/m + ell*theta_dot**2 + ell_0*theta_dot**2 + g*np.cos(theta),
-    )
+    return elastic_pend_rhs(t, y, m, g, k, ell_0)
 
 # solve the ODE, evaluate at 30 fps
 sol = solve_ivp(spring_mass_ODE, [0, 10], x0, 
@@ -51,26 +44,17 @@ plt.show()
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.lines import Line2D
-from matplotlib.transforms import Affine2D
+
+# the spring's vertices, see lagrangian_tools/spring.py
+import sys
+sys.path.append('..')
+from lagrangian_tools.spring import generate_spring, spring_polylines
 
 fig = plt.figure()
 ax = fig.add_subplot(aspect='equal')
 ax.set_xlim(-1, 1)
 ax.set_ylim(-2, 0)
 
-def generate_spring(n):
-    # The spring has a width of 2/(2n) and a height of 1
-    # data contains the x and y coordinates of the spring's vertices
-    # data = np.array([[x0 x1 x2 x3 x4 ... x_n x_n+1],
-    #                  [y0 y1 y2 y4 y5 ... y_n y_n+1]])
-    # where (x0,y0) = (0,0) and (x_n+1,y_n+1) = (0,-1)
-    data = np.zeros((2,n+2)) 
-    data[:,-1] = [0,-1]
-    for i in range(1,n+1):
-        data[0,i] = -1/(2*n) if i % 2 else 1/(2*n)
-        data[1,i] = -(2*i-1)/(2*n)
-    return data
-
 theta = np.deg2rad(15)
 ell = 0.25
 ell_0 = 1
@@ -81,19 +65,19 @@ px = spring_length * np.sin(theta)
 py = -spring_length * np.cos(theta)
 circle = ax.add_patch(plt.Circle( (px,py), 0.1, fc='b', zorder=3))
 
-# spring
-A = Affine2D().scale(2/spring_length, spring_length).rotate(theta).get_matrix()
-# note: we had to append [1 1 1 1 1 ... 1] to data to allow for matrix multiplication (affine transformation)
-data = ell_0*np.append(generate_spring(30), np.ones((1,30+2)), axis=0)
-data_new = A @ data
-spring = Line2D(data_new[0,:], data_new[1,:], color='r')
+# spring: scaled by 2/spring_length across, spring_length along, then rotated by theta
+xn, yn = spring_polylines(30, spring_length, 2, theta)
+spring = Line2D(xn, yn, color='r')
 ax.add_line(spring)
 
 plt.savefig('elastic_pendulum.png')
 
 # %%
 # Animate the spring pendulum
-import matplotlib.animation as animation
+import sys
+sys.path.append('..')
+from lagrangian_tools.render import save_animation
+from lagrangian_tools.spring import generate_spring, spring_polylines
 
 # output of the solver
 theta = sol.y[0]
@@ -107,7 +91,10 @@ ax.set_ylim(-2, 0)
 
 ell_0 = 1
 
-data = ell_0*np.append(generate_spring(30), np.ones((1,30+2)), axis=0)
+# the spring in every frame
+spring_x, spring_y = spring_polylines(30, ell_0 + ell, 2, theta)
+
+data = generate_spring(30)
 spring = Line2D(data[0,:], data[1,:], color='r')
 circle = ax.add_patch(plt.Circle( (0,0), 0.1, fc='b', zorder=3)) # doesn't matter where we put it
 ax.add_line(spring)
@@ -122,13 +109,9 @@ def animate(i):
     circle.set_center((px, py))
     
     # spring
-    A = Affine2D().scale(2/spring_length, spring_length).rotate(theta[i]).get_matrix()
-    data_new = A @ data
-    spring.set_data(data_new[0,:], data_new[1,:])
-
-# save a video: 30 fps
-ani = animation.FuncAnimation(fig, animate, frames=len(t))
-ffmpeg_writer = animation.FFMpegWriter(fps=30)
-ani.save('elastic_pendulum.gif', writer=ffmpeg_writer)
+    spring.set_data(spring_x[i], spring_y[i])
+
+# save a video: 30 fps, frames are rendered on every core
+save_animation(fig, animate, len(t), 'elastic_pendulum.gif', fps=30)
 
 
@@ -3,6 +3,11 @@ from sympy import *
 from sympy.physics.mechanics import *
 init_vprinting()
 
+# the slow simplify/solve steps are cached on disk, see lagrangian_tools/cache.py
+import sys
+sys.path.append('..')
+from lagrangian_tools.cache import cached_sympy
+
 
 # %%
 # define our symbolic variables
@@ -22,23 +27,41 @@ T = 1/2*m*(ell_dot**2 + (ell_0+ell)**2*theta_dot**2)
 V = 1/2*k*ell**2 - m*g*(ell_0+ell)*cos(theta)
 L = T - V
 
-# solve the Euler-Lagrange Equations
+# the Euler-Lagrange Equations
 eqn_1 = diff( diff(L,theta_dot), t) - diff(L, theta)
 eqn_2 = diff( diff(L,ell_dot), t) - diff(L, ell)
-sln = solve([eqn_1, eqn_2], [theta_ddot, ell_ddot])
+
+# %%
+# solve the Euler-Lagrange Equations for theta_ddot, ell_ddot
+sln = cached_sympy(solve, [eqn_1, eqn_2], [theta_ddot, ell_ddot])
 
 # show the solution
 f = Matrix([theta_dot, sln[theta_ddot], ell_dot, sln[ell_ddot]])
-f = simplify(f)
+f = cached_sympy(simplify, f)
 x = Matrix([theta, theta_dot, ell, ell_dot])
 x_dot = diff(x,t)
 
 Eq(x_dot, f)
 
 # %%
-# write each row of f in ASCII text, suitable for inclusion in simulation code
-g = f.subs({theta: 'theta', theta_dot: 'theta_dot', ell: 'ell', ell_dot: 'ell_dot'})
-for i in range(4):
-    print('f[{}] = {}'.format(i, g[i]))
+# generate elastic_rhs.py, the ODE used by animate.py, and the energies
+# (T, V) to check a solution with
+import sys
+sys.path.append('..')
+from lagrangian_tools.codegen import expression_source, ode_source, write_module
 
+write_module('elastic_rhs.py', [
+    ode_source('elastic_pend_rhs', f, x, params=[m, g, k, ell_0]),
+    expression_source('elastic_pend_energy', [T, V], x, params=[m, g, k, ell_0]),
+], generated_by='derivation.py')
 
+# %%
+# or skip the solve above: generate elastic_mm_rhs.py, which leaves the
+# equations as M(q)*q_ddot = F(q, q_dot) and solves them numerically at
+# every call
+import sys
+sys.path.append('..')
+from lagrangian_tools.codegen import mass_matrix_source, write_module
+
+x = Matrix([theta, theta_dot, ell, ell_dot])
+write_module('elastic_mm_rhs.py', [mass_matrix_source('elastic_pend_mm_rhs', [eqn_1, eqn_2], x, params=[m, g, k, ell_0])], generated_by='derivation.py')
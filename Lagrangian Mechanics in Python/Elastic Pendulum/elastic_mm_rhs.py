@@ -0,0 +1,26 @@
+# generated by derivation.py, do not edit by hand.
+# re-run the derivation to update this file.
+import numpy as np
+
+
+def elastic_pend_mm_rhs(t, y, m, g, k, ell_0):
+    theta, theta_dot, ell, ell_dot = y
+    x0 = ell + ell_0
+    x1 = 1.0*m
+    x2 = g*m
+    shape = np.shape(theta)
+    M = np.empty(shape + (2, 2))
+    M[..., 0, 0] = x0**2*x1
+    M[..., 0, 1] = 0
+    M[..., 1, 0] = 0
+    M[..., 1, 1] = x1
+    F = np.empty(shape + (2,))
+    F[..., 0] = -2.0*ell_dot*m*theta_dot*x0 - x0*x2*np.sin(theta)
+    F[..., 1] = -1.0*ell*k + 0.5*m*theta_dot**2*(2*ell + 2*ell_0) + x2*np.cos(theta)
+    q_ddot = np.linalg.solve(M, F[..., None])[..., 0]
+    return (
+        theta_dot,
+        q_ddot[..., 0],
+        ell_dot,
+        q_ddot[..., 1],
+    )
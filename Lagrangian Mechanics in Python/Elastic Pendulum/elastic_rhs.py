@@ -0,0 +1,23 @@
+# generated by derivation.py, do not edit by hand.
+# re-run the derivation to update this file.
+import numpy as np
+
+
+def elastic_pend_rhs(t, y, m, g, k, ell_0):
+    theta, theta_dot, ell, ell_dot = y
+    x0 = theta_dot**2
+    return (
+        theta_dot,
+        (-2.0*ell_dot*theta_dot - g*np.sin(theta))/(ell + ell_0),
+        ell_dot,
+        -ell*k/m + ell*x0 + ell_0*x0 + g*np.cos(theta),
+    )
+
+
+def elastic_pend_energy(t, y, m, g, k, ell_0):
+    theta, theta_dot, ell, ell_dot = y
+    x0 = ell + ell_0
+    return (
+        0.5*m*(ell_dot**2 + theta_dot**2*x0**2),
+        0.5*ell**2*k - g*m*x0*np.cos(theta),
+    )
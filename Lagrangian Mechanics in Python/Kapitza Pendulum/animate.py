@@ -17,35 +17,58 @@ b = 3
 x0 = np.array([0.1, 0])
 
 # our system of differential equations
-# see "derivation.ipynb" for details
-def kapitza_ODE(t, y):
-    theta = y[0]
-    theta_dot = y[1]
+# kapitza_rhs.py is generated by "derivation.ipynb", see there for details
+from kapitza_rhs import kapitza_damped_rhs, kapitza_damped_jac
+
+# solutions are cached on disk, see lagrangian_tools/cache.py
+import sys
+sys.path.append('..')
+from lagrangian_tools.cache import cached
+from lagrangian_tools.dense import dense_solve_ivp
 
-    return (
-        theta_dot,
-        (-a*w**2*np.sin(t*w) + g)*np.sin(theta)/ell
-    )
+def kapitza_ODE(t, y):
+    return kapitza_damped_rhs(t, y, m, g, ell, a, w, 0)
 
 def kapitza_damped_ODE(t,y):
-    theta = y[0]
-    theta_dot = y[1]
+    return kapitza_damped_rhs(t, y, m, g, ell, a, w, b)
 
-    return (
-        theta_dot,
-        (-b*theta_dot + ell*m*(-a*w**2*np.sin(t*w) + g)*np.sin(theta))/(ell**2*m)
-    )
+# analytic jacobians, used by the implicit solvers
+def kapitza_ODE_jac(t, y):
+    return kapitza_damped_jac(t, y, m, g, ell, a, w, 0)
+
+def kapitza_damped_ODE_jac(t, y):
+    return kapitza_damped_jac(t, y, m, g, ell, a, w, b)
 
 # solve the ODE
 tfinal = 2
 slowdown_factor = 20
 frame_rate = 30*slowdown_factor # 30 fps is real time
 
+# choose the solver: 'RK45' is explicit, 'Radau', 'BDF' and 'LSODA' use the
+# jacobian. LSODA is much faster for long runs (tfinal of minutes)
+method = 'RK45'
+implicit = method in ('Radau', 'BDF', 'LSODA')
+
+# the solver keeps its own steps, see lagrangian_tools/dense.py, and the
+# frames are sampled from them afterwards: changing slowdown_factor doesn't
+# integrate again
+
 # without damping
-# sol = solve_ivp(kapitza_ODE, [0, tfinal], x0, t_eval=np.linspace(0,tfinal,tfinal*frame_rate+1))
+# dense = cached(dense_solve_ivp, kapitza_ODE, [0, tfinal], x0,
+#     method=method, **({'jac': kapitza_ODE_jac} if implicit else {}))
 
 # with damping
-sol = solve_ivp(kapitza_damped_ODE, [0, tfinal], x0, t_eval=np.linspace(0,tfinal,tfinal*frame_rate+1))
+dense = cached(dense_solve_ivp, kapitza_damped_ODE, [0, tfinal], x0,
+    method=method, **({'jac': kapitza_damped_ODE_jac} if implicit else {}))
+sol = dense.sample(fps=30, speed=1/slowdown_factor)
+
+# optional: integrate the averaged (slow) dynamics instead, see averaged.py.
+# much cheaper at high w, the fast wobble is added back for rendering
+averaged = False
+if averaged:
+    from averaged import solve_averaged, fast_states
+    sol = solve_averaged(x0, np.linspace(0,tfinal,tfinal*frame_rate+1), (m, g, ell, a, w, b))
+    sol.y = fast_states(sol, (m, g, ell, a, w, b))
 
 
 # output of the solver
@@ -92,7 +115,9 @@ plt.savefig('kapitza_pendulum.png')
 
 # %%
 # Animate the pendulum
-import matplotlib.animation as animation
+import sys
+sys.path.append('..')
+from lagrangian_tools.render import save_animation
 
 # output of the solver
 theta = sol.y[0]
@@ -118,7 +143,7 @@ circle = ax.add_patch(plt.Circle( (0,0), 0.1, fc='b', zorder=3))
 stick = ax.add_line(Line2D([0,1],[0,1], color='r', linewidth=3))
 pivot = ax.add_patch(plt.Circle( (0,0), 0.03, fc='k', zorder=3))
 timestamp = ax.add_artist(plt.text(-0.25,1.4,'time = 0.00 s'))
-ax.add_artist(plt.text(-0.45,1.3,'Playback speed: 0.05x'))
+ax.add_artist(plt.text(-0.45,1.3,f'Playback speed: {1/slowdown_factor:g}x'))
 
 # animate each frame "i"
 def animate(i):
@@ -135,10 +160,29 @@ def animate(i):
     # timestamp
     timestamp.set(text=f'time = {t[i]:.3f} s')
 
-# save a video: 30 fps
-ani = animation.FuncAnimation(fig, animate, frames=len(t))
-ffmpeg_writer = animation.FFMpegWriter(fps=30)
-ani.save('kapitza_pendulum.gif', writer=ffmpeg_writer)
-
-
+# save a video: 30 fps, frames are rendered on every core
+save_animation(fig, animate, len(t), 'kapitza_pendulum.gif', fps=30)
 
+# %%
+# averaged dynamics: how good is it, and where is the pendulum stable?
+from averaged import error_report, stability_map
+
+# compare against the full solve for the constants above
+report = error_report(x0, np.linspace(0,tfinal,tfinal*frame_rate+1), (m, g, ell, a, w, b))
+for key, value in report.items():
+    print(f'{key}: {value:.4g}')
+
+# stability map over a grid of pivot amplitudes and frequencies
+a_values = np.linspace(0.01, 0.2, 100)
+f_values = np.linspace(1, 100, 100) # Hz
+stable = stability_map(a_values, 2*np.pi*f_values, (m, g, ell, a, w, b))
+
+plt.figure()
+plt.pcolormesh(f_values, a_values, stable, shading='auto', cmap='RdYlGn')
+plt.plot(f_values, np.sqrt(2*g*ell)/(2*np.pi*f_values), 'k--', label='$a w = \\sqrt{2 g \\ell}$')
+plt.ylim(a_values[0], a_values[-1])
+plt.xlabel('pivot frequency (Hz)')
+plt.ylabel('pivot amplitude $a$ (m)')
+plt.title('Kapitza Pendulum: Upright Stability')
+plt.legend()
+plt.show()
@@ -0,0 +1,87 @@
+"""Averaged (slow) dynamics of the Kapitza pendulum.
+
+The full ODE has to resolve every cycle of the pivot, so its cost grows with
+the forcing frequency w. Averaging over one cycle of the pivot leaves a slow
+ODE driven by Kapitza's effective potential
+
+    V_eff = m*g*ell*cos(theta) + m*a**2*w**2*sin(theta)**2/4
+
+whose step size does not depend on w at all. The slow ODE and the maps
+between slow and full states are derived in "derivation.ipynb" and live in
+kapitza_rhs.py. params is always the tuple (m, g, ell, a, w, b).
+"""
+import sys
+import time
+import numpy as np
+from scipy.integrate import solve_ivp
+
+from kapitza_rhs import kapitza_averaged_rhs, kapitza_damped_rhs, kapitza_to_fast, kapitza_to_slow
+
+sys.path.append('..')
+from lagrangian_tools.ensemble import solve_ensemble
+
+
+def solve_averaged(x0, t_eval, params, **options):
+    """Solve the slow dynamics for the full initial state x0 at t_eval[0].
+
+    Returns the solve_ivp solution of the slow state (theta, theta_dot).
+    Use fast_states() to add the fast wobble back, e.g. for rendering.
+    """
+    x0_slow = kapitza_to_slow(t_eval[0], np.asarray(x0, dtype=float), *params)
+    return solve_ivp(kapitza_averaged_rhs, [t_eval[0], t_eval[-1]], x0_slow,
+        t_eval=t_eval, args=tuple(params), **options)
+
+
+def fast_states(sol, params):
+    """Full (theta, theta_dot) reconstructed from a slow solution."""
+    return np.array(kapitza_to_fast(sol.t, sol.y, *params))
+
+
+def error_report(x0, t_eval, params, rtol=1e-8, atol=1e-10):
+    """Compare the averaged solve against the full kapitza_damped_rhs solve.
+
+    Both are solved with the same tolerances. Returns a dict with the
+    largest angle error of the slow solution and of the reconstructed full
+    solution, and the cost (wall time and RHS calls) of each solve.
+    """
+    start = time.perf_counter()
+    full = solve_ivp(kapitza_damped_rhs, [t_eval[0], t_eval[-1]], x0,
+        t_eval=t_eval, args=tuple(params), rtol=rtol, atol=atol)
+    full_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    slow = solve_averaged(x0, t_eval, params, rtol=rtol, atol=atol)
+    theta = fast_states(slow, params)[0]
+    averaged_time = time.perf_counter() - start
+
+    return {
+        'max_slow_error': np.abs(slow.y[0] - full.y[0]).max(),
+        'max_reconstructed_error': np.abs(theta - full.y[0]).max(),
+        'full_nfev': full.nfev,
+        'averaged_nfev': slow.nfev,
+        'full_time': full_time,
+        'averaged_time': averaged_time,
+    }
+
+
+def stability_map(a_values, w_values, params, x0=(0.1, 0), tfinal=10, tol=0.1):
+    """Which (a, w) pairs keep the pendulum upright?
+
+    Every grid point is integrated at once with the averaged dynamics
+    (a and w in params are ignored). Returns a boolean array of shape
+    (len(a_values), len(w_values)) that is True where |theta| < tol at tfinal.
+    """
+    m, g, ell, _, _, b = params
+    A, W = np.meshgrid(a_values, w_values, indexing='ij')
+    grid_params = (m, g, ell, A.ravel(), W.ravel(), b)
+
+    x0 = np.broadcast_to(np.reshape(x0, (2, 1)), (2, A.size))
+    x0_slow = np.stack(kapitza_to_slow(0, x0, *grid_params), axis=-1)
+
+    # RK4 step sized for the stiffest slow oscillation on the grid
+    omega = np.sqrt((A*W).max()**2/(2*ell**2) + g/ell)
+    steps = int(np.ceil(tfinal*omega/0.2))
+    sol = solve_ensemble(kapitza_averaged_rhs, [0, tfinal], x0_slow, substeps=steps, args=grid_params)
+
+    theta = sol.y[:, 0, -1]
+    return (np.abs(theta) < tol).reshape(A.shape)
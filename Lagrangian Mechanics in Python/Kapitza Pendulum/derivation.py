@@ -3,6 +3,11 @@ from sympy import *
 from sympy.physics.mechanics import *
 init_vprinting()
 
+# the slow simplify/solve steps are cached on disk, see lagrangian_tools/cache.py
+import sys
+sys.path.append('..')
+from lagrangian_tools.cache import cached_sympy
+
 # %%
 # define our symbolic variables
 m, g, ell, a, w, b, t = symbols('m g ell a w b t')
@@ -28,20 +33,56 @@ L = T - V
 # solve the Euler-Lagrange Equations
 eqn_1 = diff( diff(L,theta_dot), t) - diff(L, theta) + b*theta_dot # with damping
 # eqn_1 = diff( diff(L,theta_dot), t) - diff(L, theta) # no damping
-sln = solve(eqn_1, theta_ddot)[0]
+sln = cached_sympy(solve, eqn_1, theta_ddot)[0]
 
 # show the solution in state-space form
 f = Matrix([theta_dot, sln])
-f = simplify(f)
+f = cached_sympy(simplify, f)
 q = Matrix([theta, theta_dot])
 q_dot = diff(q,t)
 
 Eq(q_dot, f)
 
 # %%
-# write each row of f in ASCII text, suitable for inclusion in simulation code
-g = f.subs({theta: 'theta', theta_dot: 'theta_dot'})
-for i in range(2):
-    print('f[{}] = {}'.format(i, g[i]))
+# averaged (slow) dynamics
+# split the acceleration into a slow part and a part that oscillates with
+# the pivot: theta_ddot = f0 + F*sin(w*t)
+F = expand(sln).coeff(sin(w*t))
+f0 = cached_sympy(simplify, sln - F*sin(w*t))
+
+# averaging over one period of the pivot adds -F*dF/dtheta/(2*w**2) to the
+# slow dynamics (Kapitza's effective potential)
+sln_avg = cached_sympy(simplify, f0 - F*diff(F, theta)/(2*w**2))
+f_avg = Matrix([theta_dot, sln_avg])
+
+# the fast wobble on top of the slow angle is xi = -F*sin(w*t)/w**2, which
+# maps slow states to full states and back (to leading order in 1/w)
+xi = -F*sin(w*t)/w**2
+xi_dot = -F*cos(w*t)/w
+to_fast = Matrix([theta + xi, theta_dot + xi_dot])
+to_slow = Matrix([theta - xi, theta_dot - xi_dot])
+
+# effective potential: minus the integral of the undamped slow acceleration
+phi = symbols('phi')
+V_eff = cached_sympy(simplify, -m*ell**2*cached_sympy(integrate, sln_avg.subs(b, 0).xreplace({theta: phi}), phi))
+Eq(Function('V_eff')(phi), V_eff)
+
+# %%
+# generate kapitza_rhs.py, the ODE (and its jacobian) used by animate.py,
+# the averaged dynamics used by averaged.py and the energies (T, V). the
+# moving pivot does work on the pendulum, so T + V is not constant here
+import sys
+sys.path.append('..')
+from lagrangian_tools.codegen import expression_source, jacobian_source, ode_source, write_module
+
+params = [m, g, ell, a, w, b]
+write_module('kapitza_rhs.py', [
+    ode_source('kapitza_damped_rhs', f, q, params),
+    jacobian_source('kapitza_damped_jac', f, q, params),
+    ode_source('kapitza_averaged_rhs', f_avg, q, params),
+    expression_source('kapitza_to_fast', to_fast, q, params),
+    expression_source('kapitza_to_slow', to_slow, q, params),
+    expression_source('kapitza_energy', [T, V], q, params),
+], generated_by='derivation.py')
 
 
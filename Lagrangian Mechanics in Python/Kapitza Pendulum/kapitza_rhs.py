@@ -0,0 +1,57 @@
+# generated by derivation.py, do not edit by hand.
+# re-run the derivation to update this file.
+import numpy as np
+
+
+def kapitza_damped_rhs(t, y, m, g, ell, a, w, b):
+    theta, theta_dot = y
+    return (
+        theta_dot,
+        (-b*theta_dot + ell*m*(-a*w**2*np.sin(t*w) + g)*np.sin(theta))/(ell**2*m),
+    )
+
+
+def kapitza_damped_jac(t, y, m, g, ell, a, w, b):
+    theta, theta_dot = y
+    return np.array([
+        [0, 1],
+        [(-a*w**2*np.sin(t*w) + g)*np.cos(theta)/ell, -b/(ell**2*m)],
+    ])
+
+
+def kapitza_averaged_rhs(t, y, m, g, ell, a, w, b):
+    theta, theta_dot = y
+    return (
+        theta_dot,
+        (-1/4*a**2*m*w**2*np.sin(2*theta) - b*theta_dot + ell*g*m*np.sin(theta))/(ell**2*m),
+    )
+
+
+def kapitza_to_fast(t, y, m, g, ell, a, w, b):
+    theta, theta_dot = y
+    x0 = t*w
+    x1 = a*np.sin(theta)/ell
+    return (
+        theta + x1*np.sin(x0),
+        theta_dot + w*x1*np.cos(x0),
+    )
+
+
+def kapitza_to_slow(t, y, m, g, ell, a, w, b):
+    theta, theta_dot = y
+    x0 = t*w
+    x1 = a*np.sin(theta)/ell
+    return (
+        theta - x1*np.sin(x0),
+        theta_dot - w*x1*np.cos(x0),
+    )
+
+
+def kapitza_energy(t, y, m, g, ell, a, w, b):
+    theta, theta_dot = y
+    x0 = np.cos(theta)
+    x1 = t*w
+    return (
+        0.5*m*(ell**2*theta_dot**2*x0**2 + (a*w*np.cos(x1) - ell*theta_dot*np.sin(theta))**2),
+        g*m*(a*np.sin(x1) + ell*x0),
+    )
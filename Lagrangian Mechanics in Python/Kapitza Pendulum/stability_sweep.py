@@ -0,0 +1,49 @@
+# Stability map of the full Kapitza pendulum over a grid of pivot amplitudes
+# and frequencies, using every core. Compare with the averaged map in animate.py
+import sys
+import numpy as np
+import matplotlib.pyplot as plt
+
+from kapitza_rhs import kapitza_damped_rhs
+
+sys.path.append('..')
+from lagrangian_tools.events import Crossing
+from lagrangian_tools.sweep import sweep, grid
+
+# assign constants
+m = 1
+g = 9.81
+ell = 1
+b = 3
+
+# initial conditions
+x0 = np.array([0.1, 0])
+
+# the grid: 40 amplitudes x 40 frequencies
+a_values = np.linspace(0.01, 0.2, 40)
+f_values = np.linspace(1, 100, 40) # Hz
+a, f = grid(a_values, f_values)
+
+# simulate 10 seconds, saving 30 fps. the fixed RK4 step has to resolve the
+# fastest pivot on the grid (about 20 steps per cycle)
+tfinal = 10
+fps = 30
+substeps = int(np.ceil(20*f_values.max()/fps))
+
+# once the pendulum falls past horizontal it won't come back up: stop there,
+# see lagrangian_tools/events.py
+fallen = Crossing(0, np.pi/2, absolute=True, terminal=True)
+
+if __name__ == '__main__': # worker processes import this file on Windows
+    result = sweep(kapitza_damped_rhs, np.linspace(0, tfinal, tfinal*fps+1), x0,
+        args=(m, g, ell, a, 2*np.pi*f, b), substeps=substeps, events=[fallen])
+    stable = (np.isinf(result.t_stop) & (np.abs(result.y[:, 0, -1]) < 0.1)).reshape(len(a_values), len(f_values))
+
+    plt.pcolormesh(f_values, a_values, stable, shading='auto', cmap='RdYlGn')
+    plt.plot(f_values, np.sqrt(2*g*ell)/(2*np.pi*f_values), 'k--', label='$a w = \\sqrt{2 g \\ell}$')
+    plt.ylim(a_values[0], a_values[-1])
+    plt.xlabel('pivot frequency (Hz)')
+    plt.ylabel('pivot amplitude $a$ (m)')
+    plt.title('Kapitza Pendulum: Upright Stability (full dynamics)')
+    plt.legend()
+    plt.show()
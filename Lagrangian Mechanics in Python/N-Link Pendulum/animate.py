@@ -0,0 +1,83 @@
+# %%
+import numpy as np
+import matplotlib.pyplot as plt
+from scipy.integrate import solve_ivp
+
+# the solution is cached on disk, so re-running a cell only re-plots
+import sys
+sys.path.append('..')
+from lagrangian_tools.cache import cached
+
+# our system of differential equations
+# chain.py computes the accelerations numerically, see there for details
+from chain import Chain
+
+# number of links: try 50 or 100 too
+N = 10
+length = 2/N # the whole chain is 2 m long
+mass = 1/N
+chain = Chain(N, length=length, mass=mass, compound=True, g=9.81)
+
+# solve the ODE: y = [theta1, theta1_dot, theta2, theta2_dot, ...]
+fps = 30
+tfinal = 10
+x0 = np.zeros(2*N)
+x0[0] = np.pi/2 # first link horizontal, the rest straight out from it
+
+sol = cached(solve_ivp, chain.rhs, [0, tfinal], x0, t_eval=np.linspace(0,tfinal,tfinal*fps+1), rtol=1e-8, atol=1e-8)
+
+# output of the solver
+theta = sol.y[0::2]
+t = sol.t
+
+# the chain should conserve energy
+E = chain.energy(sol.y)
+
+# create two subplots: one for the angles and one for the energy
+fig, (ax1, ax2) = plt.subplots(2, 1, sharex=True)
+
+ax1.plot(t, theta[0], label="$\\theta_1$")
+ax1.plot(t, theta[-1], label=f"$\\theta_{{{N}}}$")
+ax1.legend()
+ax1.grid()
+ax1.set_title(f'{N}-Link Pendulum')
+ax1.set_ylabel("$\\theta$ (rad)")
+
+ax2.plot(t, E - E[0])
+ax2.grid()
+ax2.set_xlabel("time (s)")
+ax2.set_ylabel("energy error (J)")
+
+plt.show()
+
+# %%
+# Animate the chain
+import sys
+sys.path.append('..')
+from matplotlib.lines import Line2D
+from lagrangian_tools.kinematics import chain_positions
+from lagrangian_tools.render import save_animation
+
+# joint positions in every frame, see lagrangian_tools/kinematics.py
+x, y = chain_positions(theta, chain.lengths)
+
+fig = plt.figure()
+ax = fig.add_subplot(aspect='equal')
+ax.set_xlim(-2.25, 2.25)
+ax.set_ylim(-2.25, 2.25)
+ax.set_yticks([])
+ax.set_xticks([])
+ax.set_title(f'{N}-Link Pendulum')
+
+# the pivot and the whole chain as one line
+origin = ax.add_patch(plt.Circle( (0,0), 0.05, fc='k', zorder=3))
+links = ax.add_line(Line2D( x[:,0], y[:,0], color='b', linewidth=2, marker='o', markersize=3, zorder=1))
+
+# animate each frame "i"
+def animate(i):
+
+    # update graphics
+    links.set_data(x[:,i], y[:,i])
+
+# save a video: 30 fps, frames are rendered on every core
+save_animation(fig, animate, len(t), 'n_link_pendulum.gif', fps=fps)
@@ -0,0 +1,157 @@
+"""Equations of motion of a pendulum with N links, for any N.
+
+The double pendulum derivations solve the Euler-Lagrange equations for
+theta1_ddot and theta2_ddot symbolically. That solve grows combinatorially
+with the number of links and is hopeless past three or four. Here the
+accelerations are computed numerically, every time the right-hand side is
+called, with Featherstone's articulated-body algorithm: one sweep out along
+the chain for the velocities, one sweep back in that lumps everything below
+a joint into a single "articulated" inertia, and one sweep out again for the
+accelerations. The cost is O(N) per call.
+
+The conventions match the double pendulum: link 1 hangs from the pivot at
+angle theta1 from straight down, every other angle is measured from the
+previous link, and the state is y = [theta1, theta1_dot, theta2, ...].
+Each link is either a point mass at its end (the simple pendulum) or a
+uniform rod with I = m*L**2/12 about its center (the compound pendulum).
+
+All the vectors below are planar spatial vectors: motions (omega, vx, vy)
+and forces (torque, fx, fy), written in the frame of the link at its joint,
+with the link pointing down that frame's -y axis.
+"""
+import numpy as np
+
+
+class Chain():
+    """A chain of n links hanging from a fixed pivot.
+
+    length, mass -- per-link lengths and masses, a number or one per link
+    compound     -- False for point masses at the link ends, True for rods
+    g            -- acceleration due to gravity
+
+    Chain(10).rhs(t, y) is the right-hand side for solve_ivp. It also works
+    on a batch of states y of shape (2n, N), e.g. in solve_ensemble.
+    """
+    def __init__(self, n, length=1, mass=1, compound=False, g=9.81):
+        self.n = n
+        self.lengths = np.broadcast_to(np.asarray(length, dtype=float), (n,)).copy()
+        self.masses = np.broadcast_to(np.asarray(mass, dtype=float), (n,)).copy()
+        self.compound = compound
+        self.g = g
+
+        # center of mass (distance down the link) and inertia about it
+        L, m = self.lengths, self.masses
+        self.com = L/2 if compound else L
+        I_com = m*L**2/12 if compound else np.zeros(n)
+
+        # spatial inertia of each link about its joint, in link coordinates
+        self.inertia = np.zeros((n, 3, 3))
+        self.inertia[:,0,0] = I_com + m*self.com**2
+        self.inertia[:,0,1] = self.inertia[:,1,0] = m*self.com
+        self.inertia[:,1,1] = self.inertia[:,2,2] = m
+
+    def __repr__(self):
+        return (f'Chain({self.n}, length={self.lengths.tolist()}, mass={self.masses.tolist()}, '
+                f'compound={self.compound}, g={self.g})')
+
+    def accelerations(self, q, q_dot, tau=0):
+        """theta_ddot of every link, arrays of shape (n,) or (n, N).
+
+        tau -- optional joint torques, like the torques in the double
+               pendulum README
+        """
+        q = np.asarray(q, dtype=float)
+        tau = np.broadcast_to(tau, q.shape)
+        if q.ndim == 1:
+            # plain floats are much faster than 0-d numpy math
+            c, s, q_dot, tau = np.cos(q).tolist(), np.sin(q).tolist(), np.asarray(q_dot, dtype=float).tolist(), tau.tolist()
+        else:
+            c, s = np.cos(q), np.sin(q)
+        n, g = self.n, self.g
+        L = [0.0] + self.lengths[:-1].tolist() # from joint i-1 down to joint i
+        I0 = self.inertia[:,0,0].tolist()
+        mc = self.inertia[:,0,1].tolist()
+        m = self.masses.tolist()
+
+        # going from link i-1 to link i (frames rotated by theta_i, origins
+        # L[i] apart) maps a motion (w, vx, vy) to
+        #   (w, c*(L*w + vx) + s*vy, -s*(L*w + vx) + c*vy)
+
+        # out: link velocities, their velocity-product accelerations (0, cx, cy)
+        # and bias forces p. the joint axis is S = (1, 0, 0) for every link
+        cx, cy, p = [None]*n, [None]*n, [None]*n
+        w = vx = vy = 0.0
+        for i in range(n):
+            ux = L[i]*w + vx
+            w, vx, vy = w + q_dot[i], c[i]*ux + s[i]*vy, -s[i]*ux + c[i]*vy
+            cx[i], cy[i] = q_dot[i]*vy, -q_dot[i]*vx
+            h1, h2 = mc[i]*w + m[i]*vx, m[i]*vy # h = inertia @ v
+            p[i] = [vx*h2 - vy*h1, -w*h2, w*h1]
+
+        # in: articulated inertias [[a, b1, b2], [b1, P11, P12], [b2, P12, P22]]
+        # and bias forces, tip to pivot
+        A = [[I0[i], mc[i], 0.0, m[i], 0.0, m[i]] for i in range(n)]
+        U, d, u = [None]*n, [None]*n, [None]*n
+        for i in reversed(range(n)):
+            a, b1, b2, P11, P12, P22 = A[i]
+            U[i], d[i], u[i] = (a, b1, b2), a, tau[i] - p[i][0]
+            if i > 0:
+                # what link i passes to its parent: removing the joint's
+                # motion zeroes the first row and column
+                Q11, Q12, Q22 = P11 - b1*b1/a, P12 - b1*b2/a, P22 - b2*b2/a
+                f0 = p[i][0] + u[i]
+                f1 = p[i][1] + Q11*cx[i] + Q12*cy[i] + b1*u[i]/a
+                f2 = p[i][2] + Q12*cx[i] + Q22*cy[i] + b2*u[i]/a
+
+                # ... expressed in the parent's frame
+                ci, si, Li = c[i], s[i], L[i]
+                R11 = ci*ci*Q11 - 2*ci*si*Q12 + si*si*Q22
+                R12 = ci*si*(Q11 - Q22) + (ci*ci - si*si)*Q12
+                R22 = si*si*Q11 + 2*ci*si*Q12 + ci*ci*Q22
+                parent = A[i-1]
+                A[i-1] = [parent[0] + Li*Li*R11, parent[1] + Li*R11, parent[2] + Li*R12,
+                          parent[3] + R11, parent[4] + R12, parent[5] + R22]
+                g1, g2 = ci*f1 - si*f2, si*f1 + ci*f2
+                p[i-1] = [p[i-1][0] + f0 + Li*g1, p[i-1][1] + g1, p[i-1][2] + g2]
+
+        # out: accelerations, starting from the pivot accelerating up at g
+        # (the same as gravity pulling everything down)
+        q_ddot = [None]*n
+        a0, a1, a2 = 0.0, 0.0, g
+        for i in range(n):
+            ux = L[i]*a0 + a1
+            a1, a2 = c[i]*ux + s[i]*a2 + cx[i], -s[i]*ux + c[i]*a2 + cy[i]
+            q_ddot[i] = (u[i] - U[i][0]*a0 - U[i][1]*a1 - U[i][2]*a2)/d[i]
+            a0 = a0 + q_ddot[i]
+        return np.array(q_ddot)
+
+    def rhs(self, t, y):
+        """Right-hand side for y = [theta1, theta1_dot, theta2, theta2_dot, ...]."""
+        y = np.asarray(y, dtype=float)
+        dy = np.empty_like(y)
+        dy[0::2] = y[1::2]
+        dy[1::2] = self.accelerations(y[0::2], y[1::2])
+        return dy
+
+    def energy(self, y):
+        """Total energy T + V of the states y, shape (2n,) or (2n, ...)."""
+        y = np.asarray(y, dtype=float)
+        phi = np.cumsum(y[0::2], axis=0) # absolute link angles
+        omega = np.cumsum(y[1::2], axis=0)
+        shape = (-1,) + (1,)*(phi.ndim - 1)
+        L = self.lengths.reshape(shape)
+        com = self.com.reshape(shape)
+        m = self.masses.reshape(shape)
+
+        # joint heights and velocities, then the center of each link
+        jy = -np.cumsum(L*np.cos(phi), axis=0) + L*np.cos(phi)
+        jvx = np.cumsum(L*omega*np.cos(phi), axis=0) - L*omega*np.cos(phi)
+        jvy = np.cumsum(L*omega*np.sin(phi), axis=0) - L*omega*np.sin(phi)
+        y_com = jy - com*np.cos(phi)
+        vx = jvx + com*omega*np.cos(phi)
+        vy = jvy + com*omega*np.sin(phi)
+
+        I_com = (self.inertia[:,0,0] - self.masses*self.com**2).reshape(shape)
+        T = 0.5*m*(vx**2 + vy**2) + 0.5*I_com*omega**2
+        V = m*self.g*y_com
+        return (T + V).sum(axis=0)
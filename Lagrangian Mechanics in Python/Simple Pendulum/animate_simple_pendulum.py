@@ -1,12 +1,16 @@
 # %%
 import numpy as np
-from scipy.integrate import solve_ivp
 
 # matplotlib imports
 import matplotlib.pyplot as plt
 import matplotlib.gridspec as gridspec
 import matplotlib.animation as animation
 
+import sys
+sys.path.append('..')
+from lagrangian_tools.render import save_animation
+from lagrangian_tools.trajectory import save_trajectory
+
 # %%
 # assign constants (g, ell) values
 g = 9.81
@@ -20,14 +24,12 @@ theta_dot0 = 0
 t_final = 5
 fps = 30
 
-# our system of differential equations
-# y[0] is theta, y[1] is theta_dot
-def pendulum_ODE(t, y): 
-    return (y[1], -g*np.sin(y[0])/ell)
-
-# solve the ODE, 30 fps
-sol = solve_ivp(pendulum_ODE, [0, t_final], (theta0, theta_dot0), 
-    t_eval=np.linspace(0,t_final,t_final*fps+1))
+# solve the ODE, 30 fps. exact.py picks the cheapest model that stays within
+# tol radians: the small-angle solution, the exact elliptic solution, or
+# integrating the ODE numerically if it goes over the top
+from exact import solve_pendulum
+sol = solve_pendulum(np.linspace(0,t_final,t_final*fps+1), (theta0, theta_dot0), g, ell, tol=1e-6)
+print(f'model: {sol.model}')
 
 # output of the solver
 theta, theta_dot = sol.y
@@ -37,8 +39,25 @@ t = sol.t
 theta_deg = np.rad2deg(sol.y[0])
 theta_dot_deg = np.rad2deg(sol.y[1])
 
-# optional: save theta_deg in a CSV file
-np.savetxt('pend.csv', np.transpose([t, theta_deg, theta_dot_deg]), delimiter=',')
+# optional: save the solution, see lagrangian_tools/trajectory.py
+# read it back with load_trajectory('pend.traj')['theta']
+save_trajectory('pend.traj', t, sol.y, ['theta', 'theta_dot'], system='simple pendulum',
+    params={'g': g, 'ell': ell}, x0=[theta0, theta_dot0], solver={'method': str(sol.model)})
+
+# %%
+# the period grows with the amplitude. 1000 exact periods at once, no ODE solver
+from exact import pendulum_period
+
+amplitudes = np.linspace(0, np.pi, 1000, endpoint=False)
+period = pendulum_period(amplitudes, g, ell)
+plt.plot(np.rad2deg(amplitudes), period, 'b', label='exact')
+plt.plot(np.rad2deg(amplitudes), np.full_like(amplitudes, 2*np.pi*np.sqrt(ell/g)), 'k--', label='small angle')
+plt.title('Simple Pendulum: Period vs Amplitude')
+plt.xlabel('amplitude (deg)')
+plt.ylabel('period (s)')
+plt.legend()
+plt.grid()
+plt.show()
 
 # %%
 # bonus! Customize color scheme in matplotlib
@@ -160,8 +179,9 @@ ax0.set_ylabel(r'$\theta$ (deg), $\dot \theta$ (deg/s)')
 ax0.legend([r'$\theta$', r'$\dot \theta$'])
 ax0.grid()
 
-theta_curve, = ax0.plot(t[0], theta_deg[0], 'b')
-theta_dot_curve, = ax0.plot(t[0], theta_dot_deg[0], 'r')
+# the curves are plotted in full and drawn a segment per frame, see trails below
+theta_curve, = ax0.plot(t, theta_deg, 'b')
+theta_dot_curve, = ax0.plot(t, theta_dot_deg, 'r')
 
 # phase diagram
 ax1 = fig.add_subplot(gs[1,0])
@@ -171,8 +191,8 @@ ax1.set_xlabel(r'$\theta$ (deg)')
 ax1.set_ylabel(r'$\dot \theta$ (deg/s)')
 ax1.grid()
 
-phase_curve, = ax1.plot(theta_deg[0], theta_dot_deg[0], 'b')
-phase_dot, =  ax1.plot(theta_deg[0], theta_dot_deg[0], 'ro')
+phase_curve, = ax1.plot(theta_deg, theta_dot_deg, 'b')
+phase_dot, =  ax1.plot(theta_deg[0], theta_dot_deg[0], 'ro', animated=True)
 
 # pendulum
 def pend_pos(theta):
@@ -184,24 +204,21 @@ ax2.set_ylim(-1.5, 0.5)
 
 # draw the pendulum
 x0, y0 = pend_pos(theta0)
-line, = ax2.plot([0, x0], [0, y0], lw=2, c='k')
-circle = ax2.add_patch(plt.Circle(pend_pos(theta0), 0.05, fc='r', zorder=3))
+line, = ax2.plot([0, x0], [0, y0], lw=2, c='k', animated=True)
+circle = ax2.add_patch(plt.Circle(pend_pos(theta0), 0.05, fc='r', zorder=3, animated=True))
 
 
 def animate(i):
-    theta_curve.set_data(t[:i+1], theta_deg[:i+1])
-    theta_dot_curve.set_data(t[:i+1], theta_dot_deg[:i+1])
-
-    phase_curve.set_data(theta_deg[:i+1], theta_dot_deg[:i+1])
-    phase_dot.set_data((theta_deg[i], theta_dot_deg[i]))
+    phase_dot.set_data([theta_deg[i]], [theta_dot_deg[i]])
 
     x, y = pend_pos(theta[i])
     line.set_data([0, x], [0, y])
     circle.set_center((x, y))
 
-# save a video: 30 fps
-ani = animation.FuncAnimation(fig, animate, frames=len(t))
-ffmpeg_writer = animation.FFMpegWriter(fps=fps)
-ani.save('all.mp4', writer=ffmpeg_writer)
+# save a video: 30 fps, frames are rendered on every core. the axes are drawn
+# once and each frame only adds the newest segment of the trails, so long
+# runs don't slow down as the curves grow (see lagrangian_tools/render.py)
+save_animation(fig, animate, len(t), 'all.mp4', fps=fps,
+    trails=[theta_curve, theta_dot_curve, phase_curve])
 
 
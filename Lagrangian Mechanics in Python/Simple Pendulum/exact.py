@@ -0,0 +1,140 @@
+"""Closed-form solutions of the simple pendulum, and when to use which.
+
+theta_ddot = -g/ell*sin(theta) has an exact solution as long as the pendulum
+swings back and forth instead of going over the top. With w = sqrt(g/ell)
+and the amplitude theta_max,
+
+    theta(t) = 2*arcsin(k*sn(w*t + u0, k**2)),  k = sin(theta_max/2)
+    period   = 4/w*K(k**2)
+
+where sn is a Jacobi elliptic function and K the complete elliptic integral
+of the first kind (scipy.special.ellipj and ellipk). For small amplitudes
+sin(theta) ~ theta, and the familiar
+
+    theta(t) = theta0*cos(w*t) + theta_dot0/w*sin(w*t)
+
+is accurate enough. Its error grows with the amplitude (the real period is
+longer, by about theta_max**2/16) and with time, as the phase slips.
+
+solve_pendulum picks the cheapest of the three models that meets a given
+tolerance for every initial state: 'linear', 'elliptic', or 'ode' (solve_ivp)
+for states that go over the top. Tables of thousands of amplitudes never
+touch an ODE solver.
+"""
+import sys
+import numpy as np
+from scipy.integrate import solve_ivp
+from scipy.special import ellipj, ellipk, ellipkinc
+
+from pendulum_rhs import pendulum_rhs
+
+sys.path.append('..')
+from lagrangian_tools.ensemble import EnsembleSolution
+
+MODELS = ('linear', 'elliptic', 'ode')
+
+
+def _parameter(y0, g, ell):
+    # k**2 = sin(theta_max/2)**2 from the energy of the initial state, >= 1
+    # if the pendulum goes over the top
+    theta0, theta_dot0 = y0
+    return np.sin(theta0/2)**2 + ell*theta_dot0**2/(4*g)
+
+
+def amplitude(y0, g, ell):
+    """Largest angle theta_max reached from y0 = (theta0, theta_dot0), or
+    NaN if the pendulum goes over the top."""
+    m = _parameter(y0, g, ell)
+    with np.errstate(invalid='ignore'):
+        return np.where(m < 1, 2*np.arcsin(np.sqrt(m)), np.nan)
+
+
+def pendulum_period(theta_max, g, ell):
+    """Exact period of the swing with amplitude theta_max (radians).
+    Vectorized over all arguments."""
+    return 4*np.sqrt(ell/g)*ellipk(np.sin(np.asarray(theta_max)/2)**2)
+
+
+def pendulum_linear(t, y0, g, ell):
+    """(theta, theta_dot) at times t of the small-angle model. t, the
+    initial states and the constants broadcast against each other."""
+    theta0, theta_dot0 = y0
+    w = np.sqrt(g/ell)
+    c, s = np.cos(w*t), np.sin(w*t)
+    return theta0*c + theta_dot0/w*s, theta_dot0*c - theta0*w*s
+
+
+def pendulum_elliptic(t, y0, g, ell):
+    """(theta, theta_dot) at times t of the exact solution, for states that
+    don't go over the top. Broadcasts like pendulum_linear. The angles come
+    back in [-pi, pi]."""
+    theta0, theta_dot0 = y0
+    w = np.sqrt(g/ell)
+    m = _parameter(y0, g, ell)
+    k = np.sqrt(m)
+
+    # starting phase: sn(u0) = sin(theta0/2)/k, and cn(u0) has the sign of theta_dot0
+    with np.errstate(invalid='ignore', divide='ignore'):
+        phi0 = np.arcsin(np.clip(np.where(k > 0, np.sin(theta0/2)/k, 0), -1, 1))
+    u0 = ellipkinc(phi0, m)
+    u0 = np.where(theta_dot0 < 0, 2*ellipk(m) - u0, u0)
+
+    sn, cn, _, _ = ellipj(w*t + u0, m)
+    return 2*np.arcsin(k*sn), 2*k*w*cn
+
+
+def choose_model(y0, t_span, g, ell, tol=1e-6):
+    """Cheapest model name (see MODELS) for each initial state y0 whose angle
+    stays within tol radians of the true solution for t_span seconds."""
+    m = np.asarray(_parameter(y0, g, ell))
+    theta_max = amplitude(y0, g, ell)
+    w = np.sqrt(g/ell)
+
+    # the linear model swings a bit too fast, and isn't quite a sine
+    with np.errstate(invalid='ignore'):
+        slip = theta_max*(w - w*np.pi/(2*ellipk(m)))*t_span
+    error = slip + theta_max**3/64
+    # very close to the top K(m) blows up and sn loses accuracy
+    return np.where(m < 1 - 1e-9, np.where(error <= tol, 'linear', 'elliptic'), 'ode')
+
+
+def solve_pendulum(t_eval, y0, g, ell, tol=1e-6, model=None, **options):
+    """Simple pendulum at t_eval with sol.t and sol.y like solve_ivp's, from
+    the model choose_model picks for each initial state (or the given model).
+
+    y0      -- (theta0, theta_dot0), or (N, 2) for N pendulums. sol.y is then
+               (N, 2, F) like solve_ensemble's.
+    g, ell  -- numbers
+    options -- passed to solve_ivp for the 'ode' states. They default to
+               DOP853 with rtol = atol = tol/1000, which keeps the error of
+               a few seconds within tol, except within a hair of the
+               upright position where the motion is too sensitive.
+
+    sol.model holds the model used for each state, and sol.nfev counts the
+    right-hand side calls of the 'ode' ones.
+    """
+    t_eval = np.asarray(t_eval, dtype=float)
+    single = np.ndim(y0) == 1
+    y0 = np.array(y0, dtype=float, ndmin=2)
+    t = t_eval - t_eval[0]
+    if model is None:
+        model = choose_model(y0.T, t[-1], g, ell, tol)
+    model = np.broadcast_to(model, len(y0))
+    options.setdefault('method', 'DOP853')
+    options.setdefault('rtol', tol/1000)
+    options.setdefault('atol', tol/1000)
+
+    y = np.empty((len(y0), 2, len(t_eval)))
+    for name, solve in [('linear', pendulum_linear), ('elliptic', pendulum_elliptic)]:
+        i = model == name
+        if i.any():
+            y[i, 0], y[i, 1] = solve(t, y0[i].T[:, :, None], g, ell)
+    nfev = 0
+    for i in np.flatnonzero(model == 'ode'):
+        sol = solve_ivp(pendulum_rhs, [t_eval[0], t_eval[-1]], y0[i], t_eval=t_eval, args=(g, ell), **options)
+        y[i] = sol.y
+        nfev += sol.nfev
+
+    sol = EnsembleSolution(t_eval, y[0] if single else y, nfev)
+    sol.model = model[0] if single else model
+    return sol
@@ -0,0 +1,54 @@
+# %%
+import numpy as np
+import matplotlib.pyplot as plt
+from scipy.integrate import solve_ivp
+
+import sys
+sys.path.append('..')
+from lagrangian_tools.symplectic import solve_symplectic
+from lagrangian_tools.energy import energy_report
+
+# pendulum_rhs.py is generated by "model_simple_pendulum.ipynb"
+from pendulum_rhs import pendulum_rhs, pendulum_energy
+
+# %%
+# assign constants (g, ell) values
+g = 9.81
+ell = 1
+
+# initial conditions: theta=90 deg, velocity=0
+theta0 = np.pi/2
+theta_dot0 = 0
+
+# one hour at 30 fps
+t_final = 3600
+fps = 30
+t_eval = np.linspace(0, t_final, t_final*fps+1)
+
+# the default RK45 solver
+sol_rk45 = solve_ivp(pendulum_rhs, [0, t_final], (theta0, theta_dot0), t_eval=t_eval, args=(g, ell))
+
+# 4th order symplectic steps of exactly one frame, see lagrangian_tools/symplectic.py
+sol_sym = solve_symplectic(pendulum_rhs, t_eval, (theta0, theta_dot0), method='yoshida4', args=(g, ell))
+
+# total energy per unit mass, constant for the real pendulum. see lagrangian_tools/energy.py
+report_rk45 = energy_report(sol_rk45, pendulum_energy, args=(g, ell))
+report_sym = energy_report(sol_sym, pendulum_energy, args=(g, ell))
+print(f'RK45:     {report_rk45}')
+print(f'yoshida4: {report_sym}')
+
+# %%
+# RK45 loses energy steadily, the symplectic error stays bounded
+fig, (ax1, ax2) = plt.subplots(2, 1, sharex=True)
+
+ax1.plot(t_eval/60, report_rk45.E - report_rk45.E[0])
+ax1.grid()
+ax1.set_title('Energy Error Over One Hour')
+ax1.set_ylabel('RK45 (J/kg)')
+
+ax2.plot(t_eval/60, report_sym.E[0] - report_sym.E[0, 0])
+ax2.grid()
+ax2.set_xlabel('time (min)')
+ax2.set_ylabel('yoshida4 (J/kg)')
+
+plt.show()
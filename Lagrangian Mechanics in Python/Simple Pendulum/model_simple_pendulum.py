@@ -44,4 +44,17 @@ x = Matrix([theta, theta_dot])
 x_dot = diff(x, t)
 Eq(x_dot, Matrix([theta_dot, sln]))
 
+# %%
+# generate pendulum_rhs.py, the ODE with the constants as arguments,
+# and the energies (T, V) to check a solution with. m cancels out of the
+# ODE, so the energies are per unit mass and take the same (g, ell)
+import sys
+sys.path.append('..')
+from lagrangian_tools.codegen import expression_source, ode_source, write_module
+
+write_module('pendulum_rhs.py', [
+    ode_source('pendulum_rhs', Matrix([theta_dot, sln]), x, params=[g, ell]),
+    expression_source('pendulum_energy', [T/m, V/m], x, params=[g, ell]),
+], generated_by='model_simple_pendulum.py')
+
 
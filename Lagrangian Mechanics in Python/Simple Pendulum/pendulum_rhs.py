@@ -0,0 +1,21 @@
+# generated by model_simple_pendulum.py, do not edit by hand.
+# re-run the derivation to update this file.
+import numpy as np
+
+
+def pendulum_rhs(t, y, g, ell):
+    theta, theta_dot = y
+    return (
+        theta_dot,
+        -g*np.sin(theta)/ell,
+    )
+
+
+def pendulum_energy(t, y, g, ell):
+    theta, theta_dot = y
+    x0 = 0.5*ell**2*theta_dot**2
+    x1 = np.cos(theta)
+    return (
+        x0*x1**2 + x0*np.sin(theta)**2,
+        -ell*g*x1,
+    )
@@ -1,9 +1,11 @@
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.lines import Line2D
-from scipy.integrate import solve_ivp
 import matplotlib.animation as animation
-from matplotlib.transforms import Affine2D
+
+import sys
+sys.path.append('..')
+from lagrangian_tools.spring import generate_spring, spring_polylines
 
 #### Simulate the Spring Mass System ####
 # assign constants
@@ -20,14 +22,10 @@ x_dot0 = 0
 t_final = 10
 fps = 30
 
-# our system of differential equations
-# y[0]=x, y[1]=x_dot
-def spring_mass_ODE(t, y): 
-    return (y[1], g - k*y[0]/m - b*y[1]/m)
-
-# solve the ODE, evaluate at 30 fps
-sol = solve_ivp(spring_mass_ODE, [0, t_final], (x0, x_dot0), 
-    t_eval=np.linspace(0,t_final,t_final*fps+1))
+# the equation of motion is linear, so exact.py evaluates its exact
+# solution at 30 fps instead of integrating it
+from exact import solve_spring_mass
+sol = solve_spring_mass(np.linspace(0,t_final,t_final*fps+1), (x0, x_dot0), (m, g, k, b))
 
 # output of the solver
 x, x_dot = sol.y
@@ -39,19 +37,9 @@ ax = fig.add_subplot(aspect='equal')
 ax.set_xlim(-1, 1)
 ax.set_ylim(-5, 0)
 
-# generate a spring with "n" interior points, starting at (0,0) and ending at (0,-1)
-# spring has a width of 2/(2n)
-def generate_spring(n):
-    data = np.zeros((2,n+2)) # data = [x; y] is a long and skinny matrix (2 rows, many columns)
-    data[:,-1] = [0,-1]
-    for i in range(1,n+1):
-        data[0,i] = -1/(2*n) if i % 2 else 1/(2*n)
-        data[1,i] = -(2*i-1)/(2*n)
-    return data
-
-# put the (x,y) coordinates of the spring into a matrix
-# append an array of 1s in the last row
-data = np.append(generate_spring(30), np.ones((1,30+2)), axis=0)
+# a spring with 30 interior points, starting at (0,0) and ending at (0,-1)
+# see lagrangian_tools/spring.py
+data = generate_spring(30)
 
 # ell is the unstretch spring length
 ell = 2          
@@ -60,24 +48,17 @@ spring = Line2D(data[0,:], data[1,:], color='r')
 circle = ax.add_patch(plt.Circle( (0,y0), 0.25, fc='b', zorder=3))
 ax.add_line(spring)
 
+# stretch the spring in the Y direction, for every frame at once
+# the 8 is an arbitrary scalar. feel free to change
+xn, yn = spring_polylines(30, ell + x, 8)
+
 # animate each frame "i"
 def animate(i):
     y = -(ell + x[i])
     circle.set_center((0, y))
 
-    # stretch the spring in the Y direction
-    stretch_factor = -y
-    
-    # the 8 is an arbitrary scalar. feel free to change
-    A = Affine2D().scale(8/stretch_factor, stretch_factor).get_matrix()
-    data_new = np.matmul(A, data)
-
-    # get the new x and y coordinates
-    xn = data_new[0,:]
-    yn = data_new[1,:]
-
     # update the spring
-    spring.set_data(xn, yn)
+    spring.set_data(xn[i], yn[i])
 
 # save a video: 30 fps
 ani = animation.FuncAnimation(fig, animate, frames=len(t))
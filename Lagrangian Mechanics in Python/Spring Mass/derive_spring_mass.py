@@ -5,7 +5,7 @@ init_vprinting()
 
 # %%
 # define symbols
-m, g, k, t = symbols('m g k t')
+m, g, k, b, t = symbols('m g k b t')
 x = dynamicsymbols('x')
 
 # take derivatives
@@ -18,8 +18,21 @@ V = -m*g*x + 1/2*k*x**2
 L = T - V
 
 # solve Euler-Lagrange
-eqn = diff( diff(L, x_dot), t) - diff(L, x)
+eqn = diff( diff(L, x_dot), t) - diff(L, x) + b*x_dot # with damping
+# eqn = diff( diff(L, x_dot), t) - diff(L, x) # no damping
 sln = solve(eqn, x_ddot)[0]
 Eq(x_ddot, sln)
 
+# %%
+# generate spring_mass_rhs.py, the ODE with the constants as arguments,
+# and the energies (T, V) to check a solution with
+import sys
+sys.path.append('..')
+from lagrangian_tools.codegen import expression_source, ode_source, write_module
+
+write_module('spring_mass_rhs.py', [
+    ode_source('spring_mass_rhs', Matrix([x_dot, sln]), Matrix([x, x_dot]), params=[m, g, k, b]),
+    expression_source('spring_mass_energy', [T, V], Matrix([x, x_dot]), params=[m, g, k, b]),
+], generated_by='derive_spring_mass.py')
+
 
@@ -0,0 +1,95 @@
+"""Exact solution of the (damped) spring mass system.
+
+m*x_ddot + b*x_dot + k*x = m*g is linear with constant coefficients, so there
+is no need to integrate it at all. Around the equilibrium x_e = m*g/k, with
+w = sqrt(k/m) and decay rate c = b/(2m), the offset u = x - x_e is
+
+    u(t) = u0*C(t) + (u_dot0 + c*u0)*S(t)
+
+    under-damped (c < w):  C = exp(-c t) cos(wd t),  S = exp(-c t) sin(wd t)/wd
+    critically damped:     C = exp(-c t),            S = t exp(-c t)
+    over-damped (c > w):   C = exp(-c t) cosh(s t),  S = exp(-c t) sinh(s t)/s
+
+with wd = sqrt(w**2 - c**2) and s = sqrt(c**2 - w**2). That is a handful of
+array operations for any times and any number of (m, g, k, b) combinations
+at once, instead of one RK45 solve each. params is always the tuple
+(m, g, k, b), as in spring_mass_rhs.py.
+"""
+import sys
+import numpy as np
+from scipy.integrate import solve_ivp
+
+from spring_mass_rhs import spring_mass_rhs
+
+sys.path.append('..')
+from lagrangian_tools.ensemble import EnsembleSolution, solve_ensemble
+
+
+def spring_mass_exact(t, y0, params):
+    """Position and velocity (x, x_dot) at times t, starting from
+    y0 = (x0, x_dot0) at t = 0.
+
+    t, x0, x_dot0 and every parameter can be arrays; the result has their
+    broadcast shape, e.g. t (F,) with k[:, None] (N, 1) gives (N, F).
+    """
+    m, g, k, b = params
+    t = np.asarray(t, dtype=float)
+    x0, x_dot0 = y0
+    c = b/(2*m)
+    d = k/m - c**2 # wd**2, or -s**2 when over-damped
+
+    # C and S from the table above. np.where evaluates both branches, the
+    # over-damped one is written so that it can't overflow where it's used
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        wd = np.sqrt(np.abs(d))
+        decay = np.exp(-c*t)
+        C = np.where(d > 0, decay*np.cos(wd*t),
+            np.exp((wd - c)*t)*(1 + np.exp(-2*wd*t))/2)
+        S = np.where(d > 0, decay*np.sin(wd*t)/wd,
+            np.exp((wd - c)*t)*-np.expm1(-2*wd*t)/(2*wd))
+    S = np.where(d == 0, t*decay, S)
+
+    u0 = x0 - m*g/k
+    v = x_dot0 + c*u0
+    x = m*g/k + u0*C + v*S
+    # C' = -c C - d S and S' = C - c S in every case
+    x_dot = u0*(-c*C - d*S) + v*(C - c*S)
+    return x, x_dot
+
+
+def _forced_rhs(t, y, m, g, k, b, force):
+    x, x_dot = y
+    dx, dx_dot = spring_mass_rhs(t, y, m, g, k, b)
+    return dx, dx_dot + force(t, x, x_dot)/m
+
+
+def solve_spring_mass(t_eval, y0, params, force=None, **options):
+    """Spring mass solution at t_eval with sol.t and sol.y like solve_ivp's.
+
+    Uses the exact solution, unless force(t, x, x_dot) adds a (nonlinear)
+    force such as -k3*x**3 or a drag -c2*x_dot*abs(x_dot). Then the ODE is
+    integrated: with solve_ivp (and options) for one set of params, or with
+    solve_ensemble for arrays of params.
+
+    y0     -- (x0, x_dot0), or (N, 2) for N members
+    params -- (m, g, k, b), each a number or an array of shape (N,). With
+              arrays sol.y has shape (N, 2, F) like solve_ensemble's.
+    """
+    t_eval = np.asarray(t_eval, dtype=float)
+    y0 = np.asarray(y0, dtype=float)
+    batch = y0.ndim > 1 or any(np.ndim(p) for p in params)
+
+    if force is None:
+        if not batch:
+            x, x_dot = spring_mass_exact(t_eval - t_eval[0], y0, params)
+            return EnsembleSolution(t_eval, np.array([x, x_dot]), 0)
+        members = [np.asarray(p, dtype=float)[..., None] for p in params]
+        x0 = np.reshape(y0.T, (2, -1, 1))
+        x, x_dot = spring_mass_exact(t_eval - t_eval[0], x0, members)
+        return EnsembleSolution(t_eval, np.stack([x, x_dot], axis=1), 0)
+
+    args = tuple(params) + (force,)
+    if not batch:
+        return solve_ivp(_forced_rhs, [t_eval[0], t_eval[-1]], y0, t_eval=t_eval, args=args, **options)
+    N = max([len(np.atleast_2d(y0))] + [np.size(p) for p in params])
+    return solve_ensemble(_forced_rhs, t_eval, np.broadcast_to(y0, (N, 2)), args=args)
@@ -20,15 +20,11 @@ x_dot0 = 0
 t_final = 10
 fps = 30
 
-# y[0] = x, y[1] = x_dot
-def spring_mass_friction_ODE(t, y):
-    return (y[1], g - k*y[0]/m - b*y[1]/m)
-
-def spring_mass_ODE(t, y): 
-    return (y[1], g - k*y[0]/m)
-
-sol = solve_ivp(spring_mass_friction_ODE, [0, t_final], (x0, x_dot0), 
-    t_eval=np.linspace(0,t_final,t_final*fps+1))
+# m*x_ddot + b*x_dot + k*x = m*g is linear, so instead of integrating it we
+# evaluate its exact solution, see exact.py (b = 0 for no damping). nonlinear
+# terms can be added with force=..., those are integrated numerically
+from exact import solve_spring_mass
+sol = solve_spring_mass(np.linspace(0,t_final,t_final*fps+1), (x0, x_dot0), (m, g, k, b))
 
 # output of the solver
 x, x_dot = sol.y
@@ -104,3 +100,39 @@ ffmpeg_writer = animation.FFMpegWriter(fps=fps)
 ani.save('phase_diagram_with_friction.mp4', writer=ffmpeg_writer)
 
 
+
+# %%
+# how long until the damped spring comes to rest? the solver stops there
+# instead of running to t_final, see lagrangian_tools/events.py
+import sys
+sys.path.append('..')
+from lagrangian_tools.ensemble import solve_ensemble
+from lagrangian_tools.events import Crossing, EnergyBelow
+
+# spring_mass_rhs.py is generated by "derive_spring_mass.ipynb"
+from spring_mass_rhs import spring_mass_rhs, spring_mass_energy
+
+# energy when resting at the equilibrium x = m*g/k
+def rest_energy(m, g, k, b):
+    return -(m*g)**2/(2*k)
+
+# stop within 1 mJ of rest, and record every time the mass turns around on the way
+at_rest = EnergyBelow(spring_mass_energy, 1e-3, minimum=rest_energy)
+turns = Crossing(1, direction=-1)
+sol = solve_ivp(spring_mass_rhs, [0, 100], (x0, x_dot0), args=(m, g, k, b), events=[at_rest, turns])
+print(f'b={b}: at rest after {sol.t_events[0][0]:.2f} s and {len(sol.t_events[1])} bounces')
+
+# the same for 1000 amounts of damping at once. each spring drops out of the
+# batch when it comes to rest
+b_values = np.linspace(0.2, 30, 1000)
+sol_b = solve_ensemble(spring_mass_rhs, np.linspace(0, 100, 100*fps+1), np.zeros((len(b_values), 2)),
+    args=(m, g, k, b_values), events=[at_rest])
+
+plt.plot(b_values, sol_b.t_stop, 'b', lw=2)
+plt.axvline(2*np.sqrt(k*m), color='k', ls='--', label='critical damping')
+plt.title(f'Time to Come to Rest. k/m={k/m}, g={g}')
+plt.xlabel('Damping $b$ (Ns/m)')
+plt.ylabel('Time (seconds)')
+plt.legend()
+plt.grid()
+plt.show()
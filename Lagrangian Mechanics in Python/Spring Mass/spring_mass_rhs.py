@@ -0,0 +1,19 @@
+# generated by derive_spring_mass.py, do not edit by hand.
+# re-run the derivation to update this file.
+import numpy as np
+
+
+def spring_mass_rhs(t, y, m, g, k, b):
+    x, x_dot = y
+    return (
+        x_dot,
+        (-b*x_dot + g*m - k*x)/m,
+    )
+
+
+def spring_mass_energy(t, y, m, g, k, b):
+    x, x_dot = y
+    return (
+        0.5*m*x_dot**2,
+        -g*m*x + 0.5*k*x**2,
+    )
@@ -0,0 +1,9 @@
+"""Shared helpers for the Lagrangian Mechanics in Python scripts.
+
+The scripts in each system folder add the parent folder to sys.path and
+import what they need from the modules in here, e.g.
+
+    import sys
+    sys.path.append('..')
+    from lagrangian_tools.ensemble import solve_ensemble
+"""
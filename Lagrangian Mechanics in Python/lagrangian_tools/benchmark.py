@@ -0,0 +1,118 @@
+"""Measure where the time goes, and notice when it gets worse.
+
+A benchmark is a function run() that does one fixed piece of work, e.g. one
+solve_ivp call or drawing 300 frames, and returns how many times it called
+the right-hand side (or None). measure() records
+
+    wall_s     -- wall time of run()
+    rhs_calls  -- what run() returned
+    peak_bytes -- the most memory Python and numpy held at once during run()
+
+Peak memory comes from a second run under tracemalloc, because tracing
+every allocation slows pure Python code (sympy in particular) down a lot.
+Memory of child processes, e.g. ffmpeg, is not included.
+
+Results are saved as JSON together with the versions they were measured
+with, and compare_results lists what got slower or hungrier since a
+baseline. See run_benchmarks.py for the workloads.
+"""
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+
+class CallCounter():
+    """Wrap a right-hand side and count its calls.
+
+        rhs = CallCounter(pendulum_ODE)
+        solve_ivp(rhs, ...)
+        rhs.calls
+    """
+    def __init__(self, fun):
+        self.fun = fun
+        self.calls = 0
+
+    def __call__(self, *args):
+        self.calls += 1
+        return self.fun(*args)
+
+
+def measure(run, memory=True, repeat=1):
+    """Time run() and, with memory=True, run it again to trace its peak memory.
+
+    repeat -- time run() this many times and keep the fastest, which is
+              much less noisy for short stages
+    """
+    wall = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        calls = run()
+        wall.append(time.perf_counter() - start)
+    record = {'wall_s': min(wall), 'rhs_calls': calls}
+
+    if memory:
+        tracemalloc.start()
+        try:
+            run()
+            record['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return record
+
+
+def environment():
+    """Versions and machine the results were measured on."""
+    import matplotlib
+    import scipy
+    import sympy
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'scipy': scipy.__version__,
+        'sympy': sympy.__version__,
+        'matplotlib': matplotlib.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def save_results(filename, results):
+    """Write a list of measure() records (with their system, stage and
+    workload) to filename as JSON."""
+    data = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'command': ' '.join(sys.argv),
+        'environment': environment(),
+        'results': results,
+    }
+    with open(filename, 'w') as file:
+        json.dump(data, file, indent=1)
+
+
+def load_results(filename):
+    """The list of records in a file written by save_results."""
+    with open(filename) as file:
+        return json.load(file)['results']
+
+
+def compare_results(baseline, results, tolerance=1.25):
+    """Records of results that are worse than the same system and stage in
+    baseline: more than tolerance times the wall time or peak memory, or
+    any extra right-hand side calls. Returns (record, metric, old, new) tuples.
+    """
+    old = {(r['system'], r['stage']): r for r in baseline}
+    worse = []
+    for record in results:
+        before = old.get((record['system'], record['stage']))
+        if before is None or before.get('workload') != record.get('workload'):
+            continue # new or changed workload, nothing to compare with
+        for metric, limit in [('wall_s', tolerance), ('peak_bytes', tolerance), ('rhs_calls', 1)]:
+            a, b = before.get(metric), record.get(metric)
+            if a is not None and b is not None and b > a*limit:
+                worse.append((record, metric, a, b))
+    return worse
@@ -0,0 +1,194 @@
+"""Skip the integration when the same simulation has been run before.
+
+    sol = cached(solve_ivp, kapitza_ODE, [0, tfinal], x0, t_eval=t_eval)
+
+runs solve_ivp(kapitza_ODE, [0, tfinal], x0, t_eval=t_eval) the first time
+and loads the stored solution on every later run, e.g. after changing only
+the plotting or rendering code.
+
+Results are stored under a hash of everything that can change them: the
+code of the right-hand side and of every function and constant it reads
+from its globals (so editing g = 9.81 or a generated *_rhs.py module is a
+new simulation), the arguments (x0, t grid, args=...), the solver options
+and the solver, hashed the same way as the right-hand side (so editing
+rk4_step is a new simulation too). A bound method like Chain(10).rhs also
+hashes its object: the methods of its class and its attributes.
+
+The cache lives in ~/.cache/lagrangian_tools (or $LAGRANGIAN_CACHE) and is
+trimmed to max_bytes, dropping the least recently used results first.
+
+The slow steps of the sympy derivations are cached the same way:
+
+    L = cached_sympy(simplify, L)
+    sln = cached_sympy(solve, [eqn_1, eqn_2], [theta1_ddot, theta2_ddot])
+
+keyed by the expressions going in (their srepr), so a second run of a
+derivation only re-does the cheap steps.
+"""
+import hashlib
+import os
+import pickle
+import types
+
+import numpy as np
+
+CACHE_DIR = os.environ.get('LAGRANGIAN_CACHE', os.path.join(os.path.expanduser('~'), '.cache', 'lagrangian_tools'))
+MAX_BYTES = 2*1024**3
+
+
+def _code_token(code, update, seen):
+    update(code.co_code)
+    update(repr(code.co_names).encode())
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            _code_token(const, update, seen) # nested functions, lambdas
+        else:
+            update(repr(const).encode())
+
+
+def _token(value, update, seen):
+    # feed a description of value into the hash: arrays by content,
+    # functions by code, defaults, closure and referenced globals
+    if isinstance(value, (np.ndarray, np.generic)):
+        value = np.asarray(value)
+        update(f'array{value.dtype}{value.shape}'.encode())
+        update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, (list, tuple)):
+        update(f'{type(value).__name__}{len(value)}'.encode())
+        for v in value:
+            _token(v, update, seen)
+    elif isinstance(value, dict):
+        update(f'dict{len(value)}'.encode())
+        for k in sorted(value, key=repr):
+            update(repr(k).encode())
+            _token(value[k], update, seen)
+    elif isinstance(value, types.FunctionType):
+        update(f'function {value.__module__}.{value.__qualname__}'.encode())
+        if value in seen:
+            return
+        seen.add(value)
+        _code_token(value.__code__, update, seen)
+        _token(value.__defaults__, update, seen)
+        _token(value.__kwdefaults__, update, seen)
+        for cell in value.__closure__ or ():
+            _token(cell.cell_contents, update, seen)
+        for name in value.__code__.co_names:
+            if name in value.__globals__ and not isinstance(value.__globals__[name], types.ModuleType):
+                update(name.encode())
+                _token(value.__globals__[name], update, seen)
+    elif isinstance(value, types.MethodType):
+        _token(value.__func__, update, seen)
+        _token(value.__self__, update, seen)
+    elif isinstance(value, type) or callable(value) and hasattr(value, '__qualname__'):
+        # classes, builtins and ufuncs: the name is all we can hash
+        update(f'{getattr(value, "__module__", "")}.{value.__qualname__}'.encode())
+    elif hasattr(value, '__dict__') and type(value).__module__ != 'builtins':
+        # instances of Python classes: the code of their class and their attributes
+        cls = type(value)
+        update(f'instance {cls.__module__}.{cls.__qualname__}'.encode())
+        if id(value) in seen:
+            return
+        seen.add(id(value))
+        for klass in cls.__mro__[:-1]: # not object
+            for name, attr in sorted(vars(klass).items()):
+                if isinstance(attr, (staticmethod, classmethod)):
+                    attr = attr.__func__
+                if isinstance(attr, types.FunctionType):
+                    update(name.encode())
+                    _token(attr, update, seen)
+        _token(vars(value), update, seen)
+    else:
+        update(repr(value).encode())
+
+
+def cache_key(solve, fun, *args, **kwargs):
+    """The hash cached() stores solve(fun, *args, **kwargs) under."""
+    h = hashlib.sha256()
+    update = h.update
+    _token(solve, update, set())
+    _token(fun, update, set())
+    _token(args, update, set())
+    _token(kwargs, update, set())
+    return h.hexdigest()
+
+
+def cached(solve, fun, *args, cache_dir=None, max_bytes=MAX_BYTES, **kwargs):
+    """solve(fun, *args, **kwargs), loaded from disk if it was run before.
+
+    solve is solve_ivp, solve_ensemble, sweep or anything else that takes
+    the right-hand side first and returns a picklable result.
+    """
+    cache_dir = cache_dir or CACHE_DIR
+    filename = os.path.join(cache_dir, cache_key(solve, fun, *args, **kwargs) + '.pkl')
+
+    if os.path.exists(filename):
+        try:
+            with open(filename, 'rb') as file:
+                result = pickle.load(file)
+            os.utime(filename) # most recently used
+            return result
+        except (OSError, EOFError, pickle.UnpicklingError):
+            pass # half written or corrupt, simulate again
+
+    result = solve(fun, *args, **kwargs)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = f'{filename}.{os.getpid()}.tmp'
+    with open(tmp, 'wb') as file:
+        pickle.dump(result, file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, filename)
+    trim_cache(cache_dir, max_bytes)
+    return result
+
+
+def trim_cache(cache_dir=None, max_bytes=MAX_BYTES):
+    """Delete the least recently used results until the cache fits in max_bytes."""
+    cache_dir = cache_dir or CACHE_DIR
+    entries = []
+    for name in os.listdir(cache_dir):
+        if name.endswith('.pkl'):
+            stat = os.stat(os.path.join(cache_dir, name))
+            entries.append((stat.st_mtime, stat.st_size, name))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, name in sorted(entries):
+        if total <= max_bytes:
+            break
+        os.remove(os.path.join(cache_dir, name))
+        total -= size
+
+
+def clear_cache(cache_dir=None):
+    """Delete every stored result."""
+    trim_cache(cache_dir, max_bytes=0)
+
+
+def cached_sympy(func, *args, cache_dir=None, **kwargs):
+    """func(*args, **kwargs) for sympy functions like simplify, solve or
+    integrate, loaded from disk if it was computed before.
+
+    The key is the srepr of the arguments, i.e. the model itself. Results are
+    stored as srepr text and read back with eval, so only use a cache
+    directory you trust.
+    """
+    import sympy
+
+    cache_dir = os.path.join(cache_dir or CACHE_DIR, 'sympy')
+    h = hashlib.sha256()
+    h.update(f'sympy {sympy.__version__} {func.__module__}.{func.__qualname__}'.encode())
+    h.update(sympy.srepr(args).encode())
+    h.update(sympy.srepr(kwargs).encode())
+    filename = os.path.join(cache_dir, h.hexdigest() + '.txt')
+
+    if os.path.exists(filename):
+        with open(filename) as file:
+            return eval(file.read(), dict(vars(sympy)))
+
+    result = func(*args, **kwargs)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = f'{filename}.{os.getpid()}.tmp'
+    with open(tmp, 'w') as file:
+        file.write(sympy.srepr(result))
+    os.replace(tmp, filename)
+    return result
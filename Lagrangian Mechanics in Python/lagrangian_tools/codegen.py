@@ -0,0 +1,195 @@
+"""Turn the equations of motion from a derivation script into Python code.
+
+Instead of printing the solved accelerations and pasting them into the
+animation script by hand, a derivation calls write_module() to emit a small
+numpy-only module, e.g. compound_rhs.py, that the simulation imports.
+
+Repeated subexpressions (sin(theta2), sin(2*theta2), theta1_dot**2, ...)
+are pulled out with sympy's cse() so each one is computed once per call.
+The generated functions only use numpy, so they also work on a batch of
+states (see ensemble.py).
+
+Solving the Euler-Lagrange equations for the accelerations symbolically is
+the slowest step of a derivation, and its result (every acceleration over
+the determinant of the mass matrix) is much bigger than the equations
+themselves. mass_matrix_source() skips it: the equations are linear in the
+accelerations, M(q) q_ddot = F(q, q_dot), so it emits M and F as they are
+and the generated right-hand side solves for q_ddot with np.linalg.solve.
+"""
+from sympy import Derivative, Matrix, Symbol, cse, numbered_symbols
+from sympy.printing.numpy import NumPyPrinter
+
+
+def state_name(s):
+    """Python name for a state, e.g. theta1(t) -> 'theta1' and
+    Derivative(theta1(t), t) -> 'theta1_dot'."""
+    if isinstance(s, Derivative):
+        return s.expr.func.__name__ + '_' + 'd'*s.derivative_count + 'ot'
+    if isinstance(s, Symbol):
+        return s.name
+    return s.func.__name__
+
+
+def _plain(exprs, x):
+    # swap the dynamic symbols for plain symbols with printable names.
+    # xreplace matches theta_dot before looking inside it for theta.
+    names = {s: Symbol(state_name(s)) for s in x}
+    return [e.xreplace(names) for e in exprs], [names[s] for s in x]
+
+
+def _check_symbols(exprs, allowed):
+    free = set().union(*[e.free_symbols for e in exprs])
+    unknown = free - set(allowed)
+    if unknown:
+        names = ', '.join(sorted(str(s) for s in unknown))
+        raise ValueError(f'expression depends on {names}; pass them in params')
+
+
+def _printer():
+    printer = NumPyPrinter()
+    return lambda e: printer.doprint(e).replace('numpy.', 'np.')
+
+
+def _body(exprs, states, params):
+    # shared lines for every generated function: unpack the state, then
+    # compute the common subexpressions once
+    exprs, states = _plain(exprs, states)
+    _check_symbols(exprs, states + list(params) + [Symbol('t')])
+
+    taken = set().union(states, params, *[e.free_symbols for e in exprs])
+    tmp = numbered_symbols('x', exclude=taken)
+    replacements, reduced = cse(exprs, symbols=tmp)
+
+    doprint = _printer()
+    lines = [f"    {', '.join(s.name for s in states)} = y"]
+    lines += [f'    {s} = {doprint(e)}' for s, e in replacements]
+    return lines, [doprint(e) for e in reduced]
+
+
+def _signature(name, params):
+    args = ', '.join(['t', 'y'] + [str(p) for p in params])
+    return f'def {name}({args}):'
+
+
+def expression_source(name, exprs, x, params=()):
+    """Source code of name(t, y, *params) returning the tuple exprs(t, x).
+
+    exprs  -- sympy Matrix (or list) of expressions in the state and params
+    x      -- the state held in y, e.g. Matrix([theta, theta_dot])
+    params -- the remaining symbols (g, m, ...) in argument order
+    """
+    lines, outputs = _body(list(exprs), list(x), params)
+    lines.append('    return (')
+    lines += [f'        {e},' for e in outputs]
+    lines.append('    )')
+    return '\n'.join([_signature(name, params)] + lines)
+
+
+def ode_source(name, f, x, params=()):
+    """Source code of the right-hand side name(t, y, *params) for solve_ivp.
+
+    f      -- sympy Matrix of state derivatives, e.g. Matrix([theta_dot, sln])
+    x      -- the matching state, e.g. Matrix([theta, theta_dot])
+    params -- the remaining symbols (g, m, ...) in argument order
+    """
+    return expression_source(name, f, x, params)
+
+
+def jacobian_source(name, f, x, params=()):
+    """Source code of name(t, y, *params) returning the Jacobian df/dx as a
+    2D array, suitable for solve_ivp(..., jac=...) with Radau, BDF or LSODA.
+    Arguments are the same as for ode_source.
+    """
+    exprs, states = _plain(list(f), list(x))
+    J = Matrix(exprs).jacobian(states)
+    lines, outputs = _body(list(J), states, params)
+    n = len(states)
+    lines.append('    return np.array([')
+    for i in range(J.rows):
+        lines.append('        [' + ', '.join(outputs[i*n:(i+1)*n]) + '],')
+    lines.append('    ])')
+    return '\n'.join([_signature(name, params)] + lines)
+
+
+def variational_source(name, f, x, params=()):
+    """Source code of name(t, y, *params), the right-hand side of the state
+    together with a small perturbation of it (the variational equations).
+
+    y holds the state x followed by the perturbation, e.g. [theta1, ...,
+    delta_theta1, ...], and the derivatives are f(x) followed by the
+    Jacobian df/dx times the perturbation. Unlike jacobian_source this never
+    builds the n x n matrix, so it works on a batch of states y (2n, N) and
+    can be integrated with ensemble.py like any other right-hand side.
+    Arguments are the same as for ode_source.
+    """
+    exprs, states = _plain(list(f), list(x))
+    deltas = [Symbol('delta_' + s.name) for s in states]
+    Jv = Matrix(exprs).jacobian(states) * Matrix(deltas)
+    return expression_source(name, exprs + list(Jv), states + deltas, params)
+
+
+def mass_matrix(eqns, x):
+    """Split Euler-Lagrange equations (each one equal to zero) into
+    M*q_ddot = F. Returns the sympy matrices M, F.
+
+    eqns -- one equation per coordinate, e.g. [eqn_1, eqn_2]
+    x    -- the state, e.g. Matrix([theta1, theta1_dot, theta2, theta2_dot]).
+            The accelerations are the time derivatives of its velocities.
+    """
+    q_ddot = [s.diff(Symbol('t')) for s in x if isinstance(s, Derivative)]
+    eqns = Matrix(list(eqns))
+    M = eqns.jacobian(q_ddot)
+    F = -eqns.xreplace({a: 0 for a in q_ddot})
+    return M, F
+
+
+def mass_matrix_source(name, eqns, x, params=()):
+    """Source code of the right-hand side name(t, y, *params) for solve_ivp
+    that solves M(q) q_ddot = F(q, q_dot) numerically at every call, instead
+    of solving the equations symbolically first.
+
+    eqns   -- Euler-Lagrange equations, one per coordinate, see mass_matrix
+    x      -- the state held in y, e.g. Matrix([theta, theta_dot, ell, ell_dot])
+    params -- the remaining symbols (g, m, ...) in argument order
+
+    For a batch of states y of shape (n, N) it solves all N systems in one
+    np.linalg.solve call.
+    """
+    M, F = mass_matrix(eqns, x)
+    k = len(F)
+    lines, outputs = _body(list(M) + list(F), list(x), params)
+    m_out, f_out = outputs[:k*k], outputs[k*k:]
+
+    lines.append(f'    shape = np.shape({state_name(x[0])})')
+    lines.append(f'    M = np.empty(shape + ({k}, {k}))')
+    for i in range(k):
+        for j in range(k):
+            lines.append(f'    M[..., {i}, {j}] = {m_out[i*k + j]}')
+    lines.append(f'    F = np.empty(shape + ({k},))')
+    for i in range(k):
+        lines.append(f'    F[..., {i}] = {f_out[i]}')
+    lines.append('    q_ddot = np.linalg.solve(M, F[..., None])[..., 0]')
+
+    # coordinates -> their velocity in y, velocities -> q_ddot
+    derivatives, j = [], 0
+    for s in x:
+        if isinstance(s, Derivative):
+            derivatives.append(f'q_ddot[..., {j}]')
+            j += 1
+        else:
+            derivatives.append(state_name(s.diff(Symbol('t'))))
+    lines.append('    return (')
+    lines += [f'        {d},' for d in derivatives]
+    lines.append('    )')
+    return '\n'.join([_signature(name, params)] + lines)
+
+
+def write_module(filename, sources, generated_by):
+    """Write the generated functions to filename."""
+    header = [
+        f'# generated by {generated_by}, do not edit by hand.',
+        '# re-run the derivation to update this file.',
+        'import numpy as np',
+    ]
+    with open(filename, 'w') as file:
+        file.write('\n'.join(header) + '\n\n\n' + '\n\n\n'.join(sources) + '\n')
@@ -0,0 +1,141 @@
+"""Integrate once, sample at any frame rate afterwards.
+
+The scripts pass t_eval=np.linspace(0, tfinal, tfinal*fps+1) to the solver,
+so the frame rate (and any slow motion, e.g. the Kapitza pendulum's
+slowdown_factor or the double pendulum's speed = 0.25) is baked into the
+solution: change it and everything is integrated, and cached, again.
+
+Here the solver takes its own steps and only the states y and derivatives
+f = fun(t, y) at a few knots per step are kept. Between two knots the
+solution is the cubic through both ends with the right slopes (a cubic
+Hermite interpolant), which is as accurate as the 4th order steps it comes
+from. That is 2n numbers per knot, whatever the frame rate.
+
+    dense = cached(dense_solve_ivp, kapitza_damped_ODE, [0, tfinal], x0)
+    sol = dense.sample(fps=30, speed=1/20)   # 20x slow motion
+    sol.t, sol.y                             # like solve_ivp with t_eval
+
+dense_ensemble does the same for a batch of initial conditions with the
+fixed-step RK4 of ensemble.py, and interpolating a frame evaluates every
+member at once.
+"""
+import numpy as np
+from scipy.integrate import solve_ivp
+
+from .ensemble import EnsembleSolution, ensemble_rhs, rk4_step
+
+
+class DenseSolution():
+    """Output of dense_solve_ivp and dense_ensemble.
+
+    t     -- knot times, (K,)
+    y, f  -- states and derivatives at the knots, (n, K) for a single solve or
+             (N, n, K) for an ensemble, like sol.y
+    nfev  -- right-hand side calls it took
+
+    Call it with times inside [t[0], t[-1]] to get the states there, shaped
+    like sol.y: (n, M) or (N, n, M).
+    """
+    def __init__(self, t, y, f, nfev):
+        self.t = np.asarray(t, dtype=float)
+        # store knot-major, so one knot of every member is one contiguous read
+        self._y = np.ascontiguousarray(np.moveaxis(y, -1, 0))
+        self._f = np.ascontiguousarray(np.moveaxis(f, -1, 0))
+        self.nfev = nfev
+
+    @property
+    def y(self):
+        return np.moveaxis(self._y, 0, -1)
+
+    @property
+    def f(self):
+        return np.moveaxis(self._f, 0, -1)
+
+    def __call__(self, t):
+        t = np.asarray(t, dtype=float)
+        i = np.clip(np.searchsorted(self.t, t, side='right') - 1, 0, len(self.t) - 2)
+        h = self.t[i+1] - self.t[i]
+        s = (t - self.t[i])/h
+
+        # hermite basis, shaped to broadcast over the state (and member) axes
+        s = s.reshape(s.shape + (1,)*(self._y.ndim - 1))
+        h = h.reshape(s.shape)
+        s2, s3 = s*s, s*s*s
+        y = ((2*s3 - 3*s2 + 1)*self._y[i] + (s3 - 2*s2 + s)*h*self._f[i]
+             + (3*s2 - 2*s3)*self._y[i+1] + (s3 - s2)*h*self._f[i+1])
+        return np.moveaxis(y, 0, -1)
+
+    def frame_times(self, fps=30, speed=1):
+        """Times of the frames of a video at fps frames per second that plays
+        speed times real time (speed=0.25 is 4x slow motion)."""
+        dt = speed/fps
+        num_frames = 1 + int((self.t[-1] - self.t[0])/dt + 1e-9)
+        return self.t[0] + dt*np.arange(num_frames)
+
+    def sample(self, fps=30, speed=1):
+        """The frames of frame_times(fps, speed) as an EnsembleSolution, with
+        t and y like solve_ivp's."""
+        t = self.frame_times(fps, speed)
+        return EnsembleSolution(t, self(t), self.nfev)
+
+    def iter_frames(self, t_eval, chunk_size=300):
+        """Yield (t, y) for consecutive windows of chunk_size frames of
+        t_eval, like iter_ensemble, for render.save_stream."""
+        t_eval = np.asarray(t_eval, dtype=float)
+        for i in range(0, len(t_eval), chunk_size):
+            yield t_eval[i:i+chunk_size], self(t_eval[i:i+chunk_size])
+
+
+def dense_solve_ivp(fun, t_span, y0, method='RK45', refine=3, args=(), **options):
+    """Solve fun with solve_ivp at its own step sizes and return a
+    DenseSolution through the steps.
+
+    refine -- knots per solver step. The step size control only looks at the
+              ends of a step, and at loose tolerances a step can span a
+              good part of an oscillation (the Kapitza pivot at 40 Hz gets
+              about 3 per period at rtol=1e-3), too coarse for one cubic. The
+              solver's own interpolant fills in the knots in between, and 3
+              keeps the interpolation error below the solver's.
+    method and options (rtol, atol, max_step, jac, ...) go to solve_ivp.
+    fun has to accept all knot times and states at once, t (K,) and y (n, K),
+    like the generated *_rhs functions do.
+    """
+    sol = solve_ivp(fun, t_span, y0, method=method, args=args, dense_output=True, **options)
+    if not sol.success:
+        raise RuntimeError(f'{method} failed: {sol.message}')
+    t = sol.t[:-1, None] + np.diff(sol.t)[:, None]*np.arange(refine)/refine
+    t = np.append(t, sol.t[-1])
+    y = sol.sol(t)
+    y[:, ::refine] = sol.y # exact at the steps
+
+    # derivatives at every knot in one call. t broadcasts components that
+    # come back as plain numbers to every knot, and is dropped again
+    f = np.stack(np.broadcast_arrays(*fun(t, y, *args), t)[:-1])
+    return DenseSolution(t, y, f, sol.nfev + 1)
+
+
+def dense_ensemble(fun, t_span, x0, h=1/120, args=()):
+    """Solve fun for every row of x0 with fixed RK4 steps of (at most) h
+    and return a DenseSolution with a knot at every step.
+
+    h    -- step size. The default matches solve_ensemble's 4 substeps per
+            frame of a 30 fps video at normal speed. Slow motion needs
+            proportionally smaller steps to be as accurate, e.g. 1/480 at
+            0.25 speed.
+    args -- extra arguments passed to fun, see solve_ensemble
+    """
+    t0, t1 = t_span
+    num_steps = max(1, int(np.ceil((t1 - t0)/h - 1e-9)))
+    t = np.linspace(t0, t1, num_steps + 1)
+    x = np.array(x0, dtype=float, ndmin=2)
+
+    y = np.empty((len(t),) + x.shape)
+    f = np.empty((len(t),) + x.shape)
+    for i in range(num_steps):
+        y[i] = x
+        # k1 of the step is the derivative at its start
+        f[i] = ensemble_rhs(fun, t[i], x, args)
+        x = rk4_step(fun, t[i], x, t[i+1] - t[i], args, k1=f[i])
+    y[-1] = x
+    f[-1] = ensemble_rhs(fun, t[-1], x, args)
+    return DenseSolution(t, y.transpose(1, 2, 0), f.transpose(1, 2, 0), 4*num_steps + 1)
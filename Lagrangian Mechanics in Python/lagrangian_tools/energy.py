@@ -0,0 +1,68 @@
+"""Check a solution against the energy it should conserve.
+
+Every derivation builds the kinetic and potential energy T and V on its way
+to the Lagrangian, and writes them next to the ODE as e.g.
+
+    double_compound_pend_energy(t, y, g) -> (T, V)
+
+energy_report evaluates them on every frame of a solution at once and
+reports how far T + V wanders. For an undamped system that is a cheap,
+solver-independent accuracy measure: loosen rtol until the error is just
+acceptable, and that is the cheapest simulation that is still right.
+
+    sol = solve_ivp(double_compound_pend_ODE, [0, tfinal], x0, t_eval=t_eval, rtol=1e-6)
+    print(energy_report(sol, double_compound_pend_energy, args=(g,)))
+
+Damped systems (b > 0) and the driven Kapitza pendulum lose or gain energy
+on purpose, so there the report shows the physics, not the solver error.
+"""
+import numpy as np
+
+
+class EnergyReport():
+    """Output of energy_report.
+
+    t, T, V, E -- time and kinetic, potential and total energy, (F,) for a
+                  single solve or (N, F) for an ensemble
+    nfev       -- right-hand side calls the solver made
+    drift      -- E at the end minus E at the start
+    max_error  -- largest |E - E[0]|
+    max_relative_error -- max_error over the energy scale of the run, the
+                  largest |T| + |V| (E itself can be zero, e.g. a pendulum
+                  released from horizontal)
+    For an ensemble the last three have one value per member.
+    """
+    def __init__(self, t, T, V, nfev):
+        self.t = t
+        self.T = T
+        self.V = V
+        self.E = T + V
+        self.nfev = nfev
+
+        E0 = self.E[..., :1]
+        self.drift = self.E[..., -1] - E0[..., 0]
+        self.max_error = np.max(np.abs(self.E - E0), axis=-1)
+        scale = np.max(np.abs(T) + np.abs(V), axis=-1)
+        self.max_relative_error = self.max_error/np.where(scale > 0, scale, 1)
+
+    def __str__(self):
+        # the worst member of an ensemble
+        i = np.argmax(self.max_relative_error)
+        return (f'nfev {self.nfev}, energy drift {np.ravel(self.drift)[i]:.2e}, '
+                f'max error {np.ravel(self.max_error)[i]:.2e} '
+                f'(relative {np.ravel(self.max_relative_error)[i]:.2e})')
+
+
+def energy_report(sol, energy, args=()):
+    """Evaluate energy(t, y, *args) -> (T, V) over a whole solution.
+
+    sol    -- the result of solve_ivp, solve_ensemble or solve_symplectic.
+              Anything with t, y (n, F) or (N, n, F) and nfev works.
+    energy -- a generated *_energy function, e.g. pendulum_energy
+    args   -- its extra arguments, e.g. (g, ell)
+    """
+    y = np.asarray(sol.y)
+    # the generated functions unpack the states from the first axis
+    T, V = energy(sol.t, np.moveaxis(y, -2, 0), *args)
+    T, V = np.broadcast_arrays(T, V, y[..., 0, :])[:2]
+    return EnergyReport(np.asarray(sol.t), T, V, getattr(sol, 'nfev', None))
@@ -0,0 +1,173 @@
+"""Integrate many copies of the same ODE at once.
+
+Calling solve_ivp once per initial condition pays the Python overhead of an
+adaptive solver for every pendulum. Here all N states are stacked into one
+(N, n) array and advanced together with a fixed-step RK4 scheme, so the
+right-hand side is evaluated once per RK stage for the whole batch.
+
+The right-hand side is the same function you would hand to solve_ivp, e.g.
+
+    def simple_double_pend_ODE(t, y):
+        theta1 = y[0]
+        ...
+
+During a batch solve y has shape (n, N), so y[0] is the theta1 of every
+pendulum and numpy does the rest.
+
+iter_ensemble hands out the solution a window of frames at a time, for
+videos too long (or ensembles too big) to keep every frame in memory.
+solve_ensemble can also watch for events (see events.py) and stop each
+member at its own time.
+"""
+import numpy as np
+
+from .events import crossed
+
+
+class EnsembleSolution():
+    """Output of solve_ensemble.
+
+    t has shape (F,) and is shared by every member. y has shape (N, n, F),
+    so y[i] looks just like sol.y from solve_ivp for member i. nfev counts
+    right-hand side calls (each call covers the whole batch).
+
+    With events, t_events[k] and y_events[k] hold the times and states of
+    every occurrence of event k, and i_events[k] the members they belong to.
+    t_stop is the time each member hit a terminal event (np.inf if it
+    didn't); its frames after that are NaN.
+    """
+    def __init__(self, t, y, nfev, t_events=None, y_events=None, i_events=None, t_stop=None):
+        self.t = t
+        self.y = y
+        self.nfev = nfev
+        self.t_events = t_events
+        self.y_events = y_events
+        self.i_events = i_events
+        self.t_stop = t_stop
+
+
+def ensemble_rhs(fun, t, x, args=()):
+    """Evaluate fun(t, y, *args) on a batch of states x with shape (N, n).
+
+    Returns the derivatives as an (N, n) array. Components that come back as
+    plain numbers (e.g. a constant zero) are broadcast to the batch.
+    """
+    dx = fun(t, x.T, *args)
+    return np.stack(np.broadcast_arrays(*dx), axis=-1)
+
+
+def rk4_step(fun, t, x, h, args=(), k1=None):
+    """Advance the batch x from t to t+h with one classical RK4 step.
+
+    k1 -- fun at (t, x), if the caller already has it
+    """
+    if k1 is None:
+        k1 = ensemble_rhs(fun, t, x, args)
+    k2 = ensemble_rhs(fun, t + h/2, x + h/2*k1, args)
+    k3 = ensemble_rhs(fun, t + h/2, x + h/2*k2, args)
+    k4 = ensemble_rhs(fun, t + h, x + h*k3, args)
+    return x + h/6*(k1 + 2*k2 + 2*k3 + k4)
+
+
+def iter_ensemble(fun, t_eval, x0, chunk_size=300, substeps=4, args=()):
+    """Like solve_ensemble, but yields the solution chunk_size frames at a
+    time instead of returning it all at once.
+
+    Yields (t, y) with t of shape (k,) and y of shape (N, n, k), k <=
+    chunk_size, for consecutive windows of t_eval. Only the current chunk is
+    kept in memory, however long t_eval is, so the frames can be drawn (and
+    dropped) while the rest is still being integrated.
+    """
+    t_eval = np.asarray(t_eval, dtype=float)
+    x = np.array(x0, dtype=float, ndmin=2)
+
+    # store frame-major so each output frame is one contiguous write
+    frames = np.empty((min(chunk_size, len(t_eval)),) + x.shape)
+    frames[0] = x
+    k = 1
+    for i in range(len(t_eval) - 1):
+        if k == len(frames):
+            yield t_eval[i+1-k:i+1], frames.transpose(1, 2, 0).copy()
+            k = 0
+        t = t_eval[i]
+        h = (t_eval[i+1] - t_eval[i]) / substeps
+        for j in range(substeps):
+            x = rk4_step(fun, t + j*h, x, h, args)
+        frames[k] = x
+        k += 1
+    yield t_eval[len(t_eval)-k:], frames[:k].transpose(1, 2, 0) # not reused, no copy
+
+
+def _solve_events(fun, t_eval, x0, events, substeps, args):
+    x = np.array(x0, dtype=float, ndmin=2)
+    frames = np.full((len(t_eval),) + x.shape, np.nan)
+    frames[0] = x
+    active = np.arange(len(x)) # rows of x0 still in the batch
+    t_stop = np.full(len(x), np.inf)
+    found = [([], [], []) for _ in events] # times, states, members
+
+    def values(t, x):
+        return [np.broadcast_to(event(t, x.T, *args), len(x)) for event in events]
+
+    g = values(t_eval[0], x)
+    nfev = 0
+    for i in range(len(t_eval) - 1):
+        h = (t_eval[i+1] - t_eval[i]) / substeps
+        for j in range(substeps):
+            if not len(active):
+                break
+            t = t_eval[i] + j*h
+            x_new = rk4_step(fun, t, x, h, args)
+            g_new = values(t + h, x_new)
+            nfev += 4
+
+            stop = np.full(len(x), np.inf)
+            for event, g_old, g_now, (times, states, members) in zip(events, g, g_new, found):
+                hit = crossed(g_old, g_now, event.direction)
+                if hit.any():
+                    # linear between the ends of the step
+                    s = g_old[hit]/(g_old[hit] - g_now[hit])
+                    times.append(t + s*h)
+                    states.append(x[hit] + s[:, None]*(x_new[hit] - x[hit]))
+                    members.append(active[hit])
+                    if event.terminal:
+                        stop[hit] = np.minimum(stop[hit], t + s*h)
+
+            keep = np.isinf(stop)
+            if not keep.all():
+                t_stop[active[~keep]] = stop[~keep]
+                active, x_new = active[keep], x_new[keep]
+                g_new = [g_now[keep] for g_now in g_new]
+                args = tuple(a[keep] if np.ndim(a) else a for a in args)
+            x, g = x_new, g_new
+        frames[i+1, active] = x
+
+    n = frames.shape[-1]
+    t_events = [np.concatenate(times) if times else np.empty(0) for times, _, _ in found]
+    y_events = [np.concatenate(states) if states else np.empty((0, n)) for _, states, _ in found]
+    i_events = [np.concatenate(members) if members else np.empty(0, int) for _, _, members in found]
+    return EnsembleSolution(t_eval, frames.transpose(1, 2, 0), nfev, t_events, y_events, i_events, t_stop)
+
+
+def solve_ensemble(fun, t_eval, x0, substeps=4, args=(), events=None):
+    """Solve fun for every row of x0, sampled on the shared grid t_eval.
+
+    fun     -- right-hand side fun(t, y, *args), as used with solve_ivp
+    t_eval  -- increasing output times, e.g. np.linspace(0, tfinal, num_frames)
+    x0      -- initial conditions with shape (N, n), one row per member
+    substeps -- RK4 steps taken between consecutive output times. At 30 fps
+                the default of 4 already tracks the double pendulum much more
+                closely than solve_ivp's default RK45 tolerances.
+    args    -- extra arguments passed to fun. Arrays of shape (N,) give each
+               member its own parameter value.
+    events  -- optional list of events, see events.py. A member that hits a
+               terminal event is dropped from the batch.
+    """
+    t_eval = np.asarray(t_eval, dtype=float)
+    if events:
+        return _solve_events(fun, t_eval, x0, events, substeps, args)
+    chunks = iter_ensemble(fun, t_eval, x0, chunk_size=len(t_eval), substeps=substeps, args=args)
+    t, y = next(chunks)
+
+    nfev = 4*substeps*(len(t_eval) - 1)
+    return EnsembleSolution(t, y, nfev)
@@ -0,0 +1,106 @@
+"""Watch a run for the moments that matter, and stop when it's over.
+
+Every script integrates to tfinal, even when the interesting part is over
+long before: the Kapitza pendulum has fallen past horizontal, or the damped
+spring has come to rest. Events describe those moments declaratively:
+
+    Crossing(0, np.pi/2, absolute=True, terminal=True)  # |theta| passes 90 deg
+    Crossing(1, direction=-1)                  # every time x_dot turns negative
+    EnergyBelow(spring_mass_energy, 1e-3, minimum=E_rest, terminal=True)
+
+An event happens where its value crosses zero, optionally only in one
+direction. Any other moment is an Event of its own value function:
+
+    Event(lambda t, y: np.cos(y[0]), direction=-1)  # rising past horizontal
+
+terminal events stop the run, the others are only recorded. They
+are callables with terminal and direction attributes, so they work as they
+are with solve_ivp:
+
+    sol = solve_ivp(fun, [0, tfinal], x0, events=[...])
+    sol.t_events, sol.y_events
+
+and with solve_ensemble(..., events=[...]) and sweep(..., events=[...]),
+where a member that hits a terminal event drops out of the batch and stops
+costing anything, see ensemble.py.
+
+Like fun, an event is called with (t, y, *args) and works on a batch of
+states y (n, N). Crossing and EnergyBelow are picklable, so sweep can hand
+them to its worker processes; so is an Event of a module-level function,
+but not one of a lambda.
+"""
+import numpy as np
+
+
+class Event():
+    """An event where value(t, y, *args) crosses zero.
+
+    value     -- function of (t, y, *args), like fun
+    direction -- 0 for any crossing, 1 only upwards, -1 only downwards
+    terminal  -- stop the run at the event (True) or only record it
+    """
+    def __init__(self, value, direction=0, terminal=False):
+        self.value = value
+        self.direction = direction
+        self.terminal = terminal
+
+    def __call__(self, t, y, *args):
+        return self.value(t, y, *args)
+
+
+class Crossing(Event):
+    """State y[component] crossing level, zero by default.
+
+    absolute -- compare |y[component]| with level instead, e.g. an angle
+                leaving [-level, level] either way
+    """
+    def __init__(self, component, level=0, absolute=False, direction=0, terminal=False):
+        super().__init__(self._value, direction, terminal)
+        self.component = component
+        self.level = level
+        self.absolute = absolute
+
+    def _value(self, t, y, *args):
+        value = y[self.component]
+        if self.absolute:
+            value = np.abs(value)
+        return value - self.level
+
+
+class EnergyBelow(Event):
+    """Total energy T + V dropping below minimum + epsilon, e.g. a damped
+    system coming to rest. Stops the run by default.
+
+    energy  -- generated energy function, e.g. spring_mass_energy
+    minimum -- the energy at rest, e.g. energy at the equilibrium state. A
+               number, or a function of the args if it differs from member
+               to member, e.g. -(m*g)**2/(2*k) for the spring mass
+    args    -- constants for energy. By default the ones the run passes to
+               fun: every generated *_rhs takes the same constants as the
+               *_energy next to it, e.g. (g, ell) for pendulum_rhs and
+               pendulum_energy. Pass them for any other energy function.
+    """
+    def __init__(self, energy, epsilon, minimum=0, args=None, terminal=True):
+        super().__init__(self._value, -1, terminal)
+        self.energy = energy
+        self.epsilon = epsilon
+        self.minimum = minimum
+        self.args = args
+
+    def _value(self, t, y, *args):
+        args = args if self.args is None else self.args
+        T, V = self.energy(t, y, *args)
+        minimum = self.minimum(*args) if callable(self.minimum) else self.minimum
+        return T + V - minimum - self.epsilon
+
+
+def crossed(g_old, g_new, direction):
+    """Which of the values g_old -> g_new cross zero in direction, as
+    solve_ivp decides it."""
+    up = (g_old <= 0) & (g_new >= 0)
+    down = (g_old >= 0) & (g_new <= 0)
+    if direction > 0:
+        return up & (g_old != g_new)
+    if direction < 0:
+        return down & (g_old != g_new)
+    return (up | down) & (g_old != g_new)
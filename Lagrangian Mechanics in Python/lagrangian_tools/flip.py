@@ -0,0 +1,179 @@
+"""How long until a double pendulum first flips over the top?
+
+Release a double pendulum at rest from (theta1, theta2) and wait for either
+rod to pass through upright. Coloring every starting point of a grid by that
+time gives the flip-time map, the well-known fractal picture of the double
+pendulum's chaos.
+
+Most of the grid is cheap if you let it be:
+
+- a member stops being integrated as soon as it flips. The batch is compacted
+  to the members still swinging, so the rest of the run only pays for them
+- a member without the energy to put either rod upright can never flip and is
+  not integrated at all, see can_flip
+
+flip_map cuts the grid into square tiles that run on every core and writes
+each tile into a .npy file as it finishes. Re-running with the same file
+and the same settings skips the tiles that are already done, so a long
+2000 x 2000 run can be stopped and resumed. The settings are hashed into a
+.json file next to it (see cache.py); with any other grid, tfinal, h, args,
+fun or energy the run starts over.
+
+The angles are those of the derivations: theta1 from straight down, theta2
+from rod 1, so rod k points along theta1 + ... + thetak.
+"""
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from .cache import cache_key
+from .ensemble import rk4_step
+
+
+def _rod_angles(x):
+    # absolute angle of every rod, (N, links)
+    return np.cumsum(x[:, 0::2], axis=1)
+
+
+def _turns(phi):
+    # changes by one whenever a rod passes through upright
+    return np.floor((phi + np.pi)/(2*np.pi))
+
+
+def _upright(phi):
+    # rods pointing straight up, up to rounding
+    return np.abs(np.remainder(phi, 2*np.pi) - np.pi) < 1e-9
+
+
+def can_flip(energy, x0, args=()):
+    """False for the rows of x0 that don't have the energy to ever bring a
+    rod upright, so they can be skipped.
+
+    energy -- generated energy function, e.g. double_compound_pend_energy
+    x0     -- states (N, n)
+
+    The lowest potential energy with rod k upright is with every other rod
+    hanging straight down, since the potential of a chain is a sum of
+    -w*cos(rod angle) with w > 0. A member with less total energy than that
+    for every rod can never get there.
+    """
+    x0 = np.array(x0, dtype=float, ndmin=2)
+    links = x0.shape[1]//2
+    T, V = energy(0, x0.T, *args)
+    E = T + V
+
+    V_upright = []
+    for k in range(links):
+        phi = np.zeros(links)
+        phi[k] = np.pi
+        x = np.zeros(x0.shape[1])
+        x[0::2] = np.diff(phi, prepend=0) # back to relative angles
+        V_upright.append(energy(0, x, *args)[1])
+    return E >= np.min(V_upright, axis=0)
+
+
+def flip_times(fun, x0, tfinal, h=1/120, args=()):
+    """Time until either rod of every row of x0 first passes through
+    upright, or np.inf if it doesn't within tfinal. Returns an (N,) array.
+    Rows that start with a rod upright flip at time 0.
+
+    fun  -- right-hand side fun(t, y, *args), as used with solve_ivp
+    x0   -- initial states (N, n)
+    h    -- RK4 step size, also the resolution of the times
+    args -- constants for fun, each a number or an array of shape (N,)
+    """
+    x = np.array(x0, dtype=float, ndmin=2)
+    num_steps = max(1, int(np.ceil(tfinal/h - 1e-9)))
+    h = tfinal/num_steps
+
+    times = np.full(len(x), np.inf)
+    upright = np.any(_upright(_rod_angles(x)), axis=1)
+    times[upright] = 0
+    active = np.flatnonzero(~upright) # rows of x0 still in the batch
+    x = x[~upright]
+    args = tuple(a[~upright] if np.ndim(a) else a for a in args)
+    turns = _turns(_rod_angles(x))
+    for i in range(num_steps):
+        if not len(active):
+            break
+        x = rk4_step(fun, i*h, x, h, args)
+        flipped = np.any(_turns(_rod_angles(x)) != turns, axis=1)
+        if flipped.any():
+            times[active[flipped]] = (i + 1)*h
+            keep = ~flipped
+            active, x, turns = active[keep], x[keep], turns[keep]
+            args = tuple(a[keep] if np.ndim(a) else a for a in args)
+    return times
+
+
+def _flip_tile(fun, theta1, theta2, tfinal, h, args, energy):
+    theta1, theta2 = np.meshgrid(theta1, theta2, indexing='ij')
+    zeros = np.zeros(theta1.size)
+    x0 = np.stack([theta1.ravel(), zeros, theta2.ravel(), zeros], axis=1)
+    times = np.full(len(x0), np.inf)
+    swing = can_flip(energy, x0, args) if energy is not None else np.ones(len(x0), bool)
+    times[swing] = flip_times(fun, x0[swing], tfinal, h, args)
+    return times.reshape(theta1.shape)
+
+
+def flip_map(fun, theta1_values, theta2_values, tfinal, h=1/120, args=(), energy=None,
+             tile_size=100, processes=None, filename=None):
+    """flip_times of a double pendulum released at rest from every
+    (theta1, theta2) of the grid. Returns an array of shape
+    (len(theta1_values), len(theta2_values)).
+
+    energy    -- generated energy function, e.g. double_compound_pend_energy,
+                 to skip the members that can never flip (see can_flip)
+    args      -- constants for fun and energy, numbers only
+    tile_size -- the grid is computed in tiles of tile_size x tile_size
+    processes -- worker processes, defaults to every core. 1 runs in-process
+    filename  -- optional .npy file to hold the results. Unfinished tiles
+                 are NaN. An existing file is resumed if it was written with
+                 the same settings, and overwritten otherwise.
+    """
+    theta1_values = np.asarray(theta1_values, dtype=float)
+    theta2_values = np.asarray(theta2_values, dtype=float)
+    shape = (len(theta1_values), len(theta2_values))
+    if filename is None:
+        times = np.full(shape, np.nan)
+    else:
+        # everything the results depend on, stored next to them
+        meta_file = os.path.splitext(filename)[0] + '.json'
+        meta = {'key': cache_key(_flip_tile, fun, theta1_values, theta2_values, tfinal, h, args, energy),
+                'shape': list(shape), 'tfinal': tfinal, 'h': h}
+        try:
+            with open(meta_file) as file:
+                resume = json.load(file) == meta and np.load(filename, mmap_mode='r').shape == shape
+        except (OSError, ValueError):
+            resume = False
+        if resume:
+            times = np.load(filename, mmap_mode='r+')
+        else:
+            times = np.lib.format.open_memmap(filename, mode='w+', dtype=float, shape=shape)
+            times[:] = np.nan
+            times.flush()
+            with open(meta_file, 'w') as file:
+                json.dump(meta, file, indent=1)
+
+    tiles = [(slice(i, i + tile_size), slice(j, j + tile_size))
+             for i in range(0, shape[0], tile_size) for j in range(0, shape[1], tile_size)]
+    tiles = [tile for tile in tiles if np.isnan(times[tile]).any()]
+
+    def save(tile, result):
+        times[tile] = result
+        if filename is not None:
+            times.flush()
+
+    processes = processes or os.cpu_count()
+    if processes == 1:
+        for i, j in tiles:
+            save((i, j), _flip_tile(fun, theta1_values[i], theta2_values[j], tfinal, h, args, energy))
+    else:
+        with ProcessPoolExecutor(processes) as pool:
+            futures = {pool.submit(_flip_tile, fun, theta1_values[i], theta2_values[j], tfinal, h, args, energy): (i, j)
+                       for i, j in tiles}
+            for future in as_completed(futures):
+                save(futures[future], future.result())
+    return times
@@ -0,0 +1,40 @@
+"""Positions of a planar pendulum chain for a whole trajectory at once.
+
+The double pendulum scripts used to build the homogeneous transforms
+
+    Tsa = [[cos(theta1), -sin(theta1),  sin(theta1)],
+           [sin(theta1),  cos(theta1), -cos(theta1)],
+           [0,            0,            1          ]]
+
+and Tab (the same with theta2) for every frame, then read the joints off
+Tsa @ [0, 0, 1] and Tsa @ Tab @ [0, 0, 1]. Multiplying those out, joint k of
+a chain of links hanging from the origin is just
+
+    x_k = x_{k-1} + ell_k*sin(phi_k),  y_k = y_{k-1} - ell_k*cos(phi_k)
+
+with phi_k = theta_1 + ... + theta_k, which numpy evaluates for every frame
+(and every pendulum of an ensemble) in a few array operations.
+"""
+import numpy as np
+
+
+def chain_positions(thetas, lengths=1):
+    """Joint positions of a chain of links hanging from the origin.
+
+    thetas  -- one array per link, all of the same shape, e.g. (theta1, theta2)
+               for every frame. Each angle is measured from the previous link
+               (the first from straight down), as in the derivations
+    lengths -- link lengths, a number or one per link
+
+    Returns x, y, each of shape (links+1, *thetas[0].shape). x[0], y[0] is
+    the pivot, x[k], y[k] the end of link k. Pass the angles frame-major,
+    e.g. sol.y[:,0].T for an ensemble, so that x[:, i] is one frame.
+    """
+    phi = np.cumsum(np.asarray(thetas, dtype=float), axis=0)
+    lengths = np.reshape(np.broadcast_to(lengths, len(phi)), (-1,) + (1,)*(phi.ndim - 1))
+
+    x = np.zeros((len(phi) + 1,) + phi.shape[1:])
+    y = np.zeros_like(x)
+    np.cumsum(lengths*np.sin(phi), axis=0, out=x[1:])
+    np.cumsum(-lengths*np.cos(phi), axis=0, out=y[1:])
+    return x, y
@@ -0,0 +1,87 @@
+"""How chaotic is each starting point? Finite-time Lyapunov exponents.
+
+Two double pendulums that start a tiny distance apart drift apart roughly
+like exp(lambda*t). lambda, the (largest) finite-time Lyapunov exponent,
+is near zero where the motion is regular and large where it is chaotic.
+
+Running a twin pendulum next to every grid point and measuring the gap works,
+but the gap has to start small enough to stay linear and yet not drown in
+rounding errors. The variational equations avoid both: they move an
+infinitesimal perturbation delta along with the state,
+
+    d(delta)/dt = J(x) delta,  J = df/dx
+
+and the derivations generate them as e.g.
+double_compound_pend_variational(t, y, g) with y = [x, delta], see
+codegen.variational_source. They are linear in delta, so delta can be scaled
+back to unit length after every step, keeping the running sum of the logs.
+
+    theta1, theta2 = grid(theta1_values, theta2_values)
+    x0 = np.stack([theta1, 0*theta1, theta2, 0*theta2], axis=1)
+    lam = ftle(double_compound_pend_variational, x0, tfinal=10, args=(g,))
+
+Like sweep.py the grid is cut into shards that run in worker processes.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from .ensemble import rk4_step
+from .sweep import _shard
+
+
+def _ftle_shard(fun, x0, delta0, tfinal, num_steps, args):
+    n = x0.shape[1]
+    x = np.hstack([x0, delta0])
+    log_growth = np.zeros(len(x))
+    h = tfinal/num_steps
+    for i in range(num_steps):
+        x = rk4_step(fun, i*h, x, h, args)
+        norm = np.linalg.norm(x[:, n:], axis=1)
+        log_growth += np.log(norm)
+        x[:, n:] /= norm[:, None]
+    return log_growth/tfinal
+
+
+def ftle(fun, x0, tfinal, h=1/120, delta0=None, args=(), processes=None, shard_size=None):
+    """Largest finite-time Lyapunov exponent over [0, tfinal] of every row
+    of x0, in 1/s. Returns an (N,) array.
+
+    fun        -- generated variational equations, e.g.
+                  simple_double_pend_variational
+    x0         -- initial states (N, n), without the perturbation
+    h          -- RK4 step size
+    delta0     -- starting perturbation (n,) or (N, n), defaults to the same
+                  amount in every state. Any direction works for a long
+                  enough tfinal, it turns towards the fastest growing one.
+    args       -- constants for fun, each a number or an array of shape (N,)
+    processes  -- worker processes, defaults to every core. 1 runs in-process
+    shard_size -- grid points per task, defaults to ~4 tasks per worker and
+                  at most 4000, which keeps the temporaries of the generated
+                  code small
+    """
+    x0 = np.array(x0, dtype=float, ndmin=2)
+    N, n = x0.shape
+    if delta0 is None:
+        delta0 = np.ones(n)
+    delta0 = np.array(np.broadcast_to(delta0, (N, n)), dtype=float)
+    delta0 /= np.linalg.norm(delta0, axis=1)[:, None]
+    num_steps = max(1, int(np.ceil(tfinal/h - 1e-9)))
+
+    processes = processes or os.cpu_count()
+    shard_size = shard_size or min(4000, max(1, -(-N // (4*processes))))
+    shards = [(lo, min(lo + shard_size, N)) for lo in range(0, N, shard_size)]
+
+    lam = np.empty(N)
+    if processes == 1:
+        for lo, hi in shards:
+            lam[lo:hi] = _ftle_shard(fun, x0[lo:hi], delta0[lo:hi], tfinal, num_steps, _shard(args, lo, hi))
+    else:
+        with ProcessPoolExecutor(processes) as pool:
+            futures = {pool.submit(_ftle_shard, fun, x0[lo:hi], delta0[lo:hi], tfinal, num_steps, _shard(args, lo, hi)): (lo, hi)
+                       for lo, hi in shards}
+            for future in as_completed(futures):
+                lo, hi = futures[future]
+                lam[lo:hi] = future.result()
+    return lam
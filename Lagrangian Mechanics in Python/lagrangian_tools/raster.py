@@ -0,0 +1,95 @@
+"""Draw thousands of line segments and discs straight into an RGB image.
+
+Updating one matplotlib artist per rod and per mass, then re-rasterizing the
+whole figure, is by far the slowest part of the 1000 pendulum videos. A
+Framebuffer instead keeps one preallocated (height, width, 3) uint8 image and
+draws every segment and every disc of a frame with a handful of numpy
+operations. The image can be handed straight to a video writer, e.g. as the
+return value of moviepy's make_frame.
+
+Drawing is not anti-aliased. Later shapes are drawn over earlier ones, and
+discs are drawn over segments, like zorder=3 masses over zorder=1 rods.
+"""
+import numpy as np
+
+
+class Framebuffer():
+    """An RGB image showing the data region xlim x ylim.
+
+    width, height -- image size in pixels, e.g. 1920, 1080
+    xlim, ylim    -- data coordinates at the image edges
+    background    -- RGB color (0-1 floats) used by clear()
+    """
+    def __init__(self, width, height, xlim, ylim, background=(0, 0, 0)):
+        self.width = width
+        self.height = height
+        self.image = np.zeros((height, width, 3), dtype=np.uint8)
+        self.background = to_rgb8(background)
+
+        # data -> pixel: column = (x - x0)*sx, row = (y - y0)*sy
+        self.sx = width / (xlim[1] - xlim[0])
+        self.sy = -height / (ylim[1] - ylim[0])
+        self.x0 = xlim[0]
+        self.y0 = ylim[1]
+        self._stencils = {}
+
+    def clear(self):
+        self.image[:] = self.background
+
+    def to_pixels(self, x, y):
+        """Fractional (column, row) pixel coordinates of data points."""
+        return (np.asarray(x) - self.x0)*self.sx, (np.asarray(y) - self.y0)*self.sy
+
+    def _plot(self, cols, rows, colors):
+        # cols, rows: (N, K) pixel coordinates, colors: (N, 3)
+        cols = np.rint(cols).astype(np.intp)
+        rows = np.rint(rows).astype(np.intp)
+        inside = (cols >= 0) & (cols < self.width) & (rows >= 0) & (rows < self.height)
+        member = np.broadcast_to(np.arange(len(colors))[:, None], cols.shape)[inside]
+        pixels = self.image.reshape(-1, 3)
+        pixels[rows[inside]*self.width + cols[inside]] = colors[member]
+
+    def draw_segments(self, x0, y0, x1, y1, colors, width=1):
+        """Draw N segments (x0, y0)-(x1, y1), all in data coordinates.
+
+        colors is an (N, 3) uint8 array, see to_rgb8. width is in pixels.
+        """
+        c0, r0 = self.to_pixels(x0, y0)
+        c1, r1 = self.to_pixels(x1, y1)
+
+        # sample every segment at (at least) one point per pixel of length
+        length = np.hypot(c1 - c0, r1 - r0)
+        samples = int(np.ceil(length.max(initial=0))) + 1
+        s = np.linspace(0, 1, samples)
+        cols = c0[:, None] + (c1 - c0)[:, None]*s
+        rows = r0[:, None] + (r1 - r0)[:, None]*s
+
+        # thicker lines are the same samples shifted across the line
+        for offset in np.arange(width) - (width - 1)/2:
+            self._plot(cols + offset*self._normal(r1 - r0, length), rows - offset*self._normal(c1 - c0, length), colors)
+
+    @staticmethod
+    def _normal(d, length):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.nan_to_num(d / length)[:, None]
+
+    def _stencil(self, radius):
+        # pixel offsets covered by a disc of the given radius (in pixels)
+        key = round(radius, 3)
+        if key not in self._stencils:
+            r = int(np.ceil(radius))
+            dr, dc = np.mgrid[-r:r+1, -r:r+1]
+            inside = dr**2 + dc**2 <= radius**2
+            self._stencils[key] = (dc[inside], dr[inside])
+        return self._stencils[key]
+
+    def draw_discs(self, x, y, radius, colors):
+        """Draw N filled discs centered at (x, y) with a radius in data units."""
+        cols, rows = self.to_pixels(x, y)
+        dc, dr = self._stencil(radius*self.sx)
+        self._plot(np.rint(cols)[:, None] + dc, np.rint(rows)[:, None] + dr, colors)
+
+
+def to_rgb8(colors):
+    """Convert 0-1 float RGB colors (e.g. from hsv_to_rgb) to uint8."""
+    return np.clip(np.rint(np.asarray(colors)*255), 0, 255).astype(np.uint8)
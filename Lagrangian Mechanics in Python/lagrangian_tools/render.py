@@ -0,0 +1,325 @@
+"""Render a matplotlib animation on every core and pipe it into ffmpeg.
+
+FuncAnimation.save draws one frame at a time and then waits for ffmpeg to
+take it. save_animation instead forks worker processes, each with its own
+copy of the figure, and gives every worker a chunk of consecutive frames.
+The finished chunks are written into a single ffmpeg stdin pipe in frame
+order.
+
+Only a few chunks per worker are in flight at any time, so memory stays
+bounded however long the video is. If ffmpeg falls behind, writing to the
+pipe blocks and no new chunks are handed out until it catches up.
+
+The figure and the animate(i) function are set up exactly as for
+FuncAnimation, e.g.
+
+    save_animation(fig, animate, len(t), 'kapitza_pendulum.gif', fps=30)
+
+animate has to draw frame i from scratch (no state carried over from frame
+i-1), because consecutive frames are drawn by different processes.
+
+Plots that trace a curve as they go, e.g. theta vs time next to the
+pendulum, would redraw the whole history with set_data(t[:i+1], ...) in every
+frame, which makes a long video quadratic in its length. Pass those lines as
+trails instead, plotted with all their data, and mark the artists animate
+moves with animated=True (matplotlib's blitting convention):
+
+    theta_curve, = ax0.plot(t, theta, 'b')
+    circle = ax1.add_patch(plt.Circle((x0, y0), 0.05, animated=True))
+    save_animation(fig, animate, len(t), 'all.mp4', trails=[theta_curve])
+
+The rest of the figure is drawn once. Every frame adds the newest segment of
+each trail to that background, keeps it for the next frame, and draws only
+the animated artists on top, so the cost per frame stays constant. What a
+full redraw puts on top of the trails and animated artists (spines, grids,
+legends, tick labels of a neighbouring axes reaching in) is left out of the
+background and drawn with the animated artists, in the same order.
+
+save_stream does the same for a solution that is still being integrated
+(see stream.py): each chunk of states is drawn as it arrives, so the whole
+trajectory is never in memory. write_video encodes images that are already
+drawn, e.g. raster.Framebuffer frames.
+"""
+import io
+import multiprocessing
+import os
+import subprocess
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg, RendererAgg
+
+# set by _init_worker in every worker process (or in-process for processes=1)
+_fig = None
+_animate = None
+_trails = None # (line, x, y) for every trail, see _render_trails
+
+# the figure without trails or animated artists, every trail's own layer
+# with its segments up to frame _drawn, and the image parts they cover
+_static = None
+_layers = None
+_regions = None
+_drawn = -1
+
+
+def _init_worker(fig, animate, trails=None):
+    global _fig, _animate, _trails, _static
+    _fig = fig
+    _animate = animate
+    _trails = trails
+    _static = None
+
+
+def _region(artist, height):
+    # rows and columns of the image that artist can draw on
+    if artist.axes is None or not artist.get_clip_on():
+        return slice(None), slice(None)
+    x0, y0, x1, y1 = artist.axes.bbox.extents
+    return (slice(max(int(height - y1), 0), max(int(np.ceil(height - y0)), 0)),
+            slice(max(int(x0), 0), max(int(np.ceil(x1)), 0)))
+
+
+def _over(image, layer):
+    # alpha-composite the rgba layer onto the opaque image, in place
+    alpha = layer[..., 3:].astype(np.uint32)
+    image[..., :3] = (layer[..., :3]*alpha + image[..., :3]*(255 - alpha) + 127) // 255
+
+
+def _render_trails(frames):
+    # like _render, adding one segment of every trail per frame. each trail
+    # builds up on a transparent layer of its own, and the layers go onto
+    # the background in the order a full redraw would draw the trails
+    global _static, _layers, _regions, _drawn
+    canvas = _fig.canvas
+    if _static is None:
+        canvas.draw() # skips the animated artists, trails included
+        _static = np.array(canvas.buffer_rgba())
+        width, height = canvas.get_width_height()
+        _layers = [RendererAgg(width, height, _fig.dpi) for _ in _trails]
+        _regions = [_region(line, height) for line, _, _ in _trails]
+        _drawn = -1
+    # in the order of a full redraw: axes by axes, their patch first, then by zorder
+    order = {ax: k for k, ax in enumerate(_fig.axes)}
+    moving = sorted(_fig.findobj(lambda a: a.get_animated() and a.get_visible()),
+        key=lambda a: (order.get(a.axes, len(order)), a.axes is None or a is not a.axes.patch,
+                       a.get_zorder()))
+    moving = [a for a in moving if all(a is not line for line, _, _ in _trails)]
+
+    image = np.asarray(canvas.buffer_rgba())
+    data = io.BytesIO()
+    for i in frames:
+        if i <= _drawn:
+            for layer in _layers:
+                layer.clear()
+            _drawn = -1
+        # also catches up on the frames other processes drew
+        for (line, x, y), layer in zip(_trails, _layers):
+            for j in range(_drawn + 1, i + 1):
+                line.set_data(x[max(j - 1, 0):j + 1], y[max(j - 1, 0):j + 1])
+                line.draw(layer)
+        _drawn = i
+
+        image[...] = _static
+        for layer, region in zip(_layers, _regions):
+            _over(image[region], np.asarray(layer.buffer_rgba())[region])
+        _animate(i)
+        for artist in moving:
+            _fig.draw_artist(artist)
+        data.write(canvas.buffer_rgba())
+    return data.getvalue()
+
+
+def _render(frames):
+    # raw rgba bytes of the given frames, back to back
+    # (savefig draws on a temporary Agg canvas, never on a GUI one)
+    if _trails is not None:
+        return _render_trails(frames)
+    data = io.BytesIO()
+    for i in frames:
+        _animate(i)
+        _fig.savefig(data, format='rgba', dpi=_fig.dpi)
+    return data.getvalue()
+
+
+def _render_states(t, y):
+    # like _render, for the frames of one chunk of a stream
+    data = io.BytesIO()
+    for i in range(len(t)):
+        _animate(t[i], y[..., i])
+        _fig.savefig(data, format='rgba', dpi=_fig.dpi)
+    return data.getvalue()
+
+
+def render_frames(fig, animate, frames):
+    """Raw rgba bytes of animate(i) for every i in frames, drawn in this
+    process, e.g. to time the drawing without encoding."""
+    _init_worker(fig, animate)
+    return _render(frames)
+
+
+def ffmpeg_command(filename, size, fps, pix_fmt='rgba'):
+    """ffmpeg arguments for encoding raw frames of size (width, height) from
+    stdin, with the same output settings as matplotlib's FFMpegWriter.
+    pix_fmt is 'rgba' for savefig output, 'rgb24' for raster.Framebuffer."""
+    args = [matplotlib.rcParams['animation.ffmpeg_path'],
+        '-f', 'rawvideo', '-vcodec', 'rawvideo',
+        '-s', f'{size[0]}x{size[1]}', '-pix_fmt', pix_fmt,
+        '-framerate', str(fps), '-i', 'pipe:', '-loglevel', 'error']
+    if filename.endswith('.gif'):
+        args += ['-filter_complex', 'split [a][b];[a] palettegen [p];[b][p] paletteuse']
+    else:
+        args += ['-vcodec', 'h264', '-pix_fmt', 'yuv420p']
+    return args + ['-y', filename]
+
+
+def _pipe(fig, animate, jobs, filename, fps, processes, trails=None):
+    # run the (function, args) jobs on fig and animate, in worker processes,
+    # and write their frames to ffmpeg in order
+    processes = processes or os.cpu_count()
+    if 'fork' not in multiprocessing.get_all_start_methods():
+        processes = 1 # workers need a copy of fig and animate as they are now
+
+    size = [int(x) for x in fig.get_size_inches()*fig.dpi]
+    ffmpeg = subprocess.Popen(ffmpeg_command(filename, size, fps), stdin=subprocess.PIPE)
+
+    try:
+        if processes == 1:
+            _init_worker(fig, animate, trails)
+            for function, args in jobs:
+                ffmpeg.stdin.write(function(*args))
+        else:
+            context = multiprocessing.get_context('fork')
+            with ProcessPoolExecutor(processes, mp_context=context,
+                    initializer=_init_worker, initargs=(fig, animate, trails)) as pool:
+                # keep 2 chunks per worker queued, oldest first
+                pending = deque()
+                for function, args in jobs:
+                    if len(pending) == 2*processes:
+                        ffmpeg.stdin.write(pending.popleft().result())
+                    pending.append(pool.submit(function, *args))
+                while pending:
+                    ffmpeg.stdin.write(pending.popleft().result())
+    finally:
+        ffmpeg.stdin.close()
+        ffmpeg.wait()
+
+    if ffmpeg.returncode:
+        raise RuntimeError(f'ffmpeg exited with code {ffmpeg.returncode} while writing {filename}')
+
+
+def _redraw_order(fig, lines):
+    # lines in the order a full redraw draws them: axes by axes, by zorder
+    order = {ax: k for k, ax in enumerate(fig.axes)}
+    return sorted(lines, key=lambda line: (order.get(line.axes, len(order)), line.get_zorder(),
+        line.axes.get_children().index(line) if line.axes else 0))
+
+
+def _overlays(fig, moving):
+    # the artists a full redraw puts on top of the moving ones (trails and
+    # animated artists): the ones after them in their axes, and whatever of
+    # the later axes or of the figure itself (titles, legends) reaches into
+    # the axes they move in
+    renderer = fig.canvas.get_renderer()
+
+    def reaches(artists, boxes):
+        # the ones of artists drawn into any of boxes
+        return [a for a in artists if a.get_tightbbox(renderer) is not None
+                and any(a.get_tightbbox(renderer).overlaps(box) for box in boxes)]
+
+    overlays, boxes = [], []
+    for ax in fig.axes:
+        # axes draw their children by zorder, the order they were added in on ties
+        children = sorted([a for a in ax.get_children() if a is not ax.patch],
+                          key=lambda a: a.get_zorder())
+        first = min([children.index(a) for a in moving if a in children], default=len(children))
+        overlays += reaches([ax.patch] + children[:first], boxes)
+        overlays += [a for a in children[first:] if a not in moving]
+        boxes += [fig.bbox if not a.get_clip_on() else ax.bbox for a in children[first:] if a in moving]
+    boxes += [fig.bbox for a in moving if a.axes is None]
+    overlays += reaches([a for a in fig.get_children() if a is not fig.patch and a not in fig.axes], boxes)
+    return [a for a in overlays if not a.get_animated()]
+
+
+def save_animation(fig, animate, frames, filename, fps=30, processes=None, chunk_size=None,
+                   trails=None):
+    """Render animate(0), ..., animate(frames-1) on fig and encode them.
+
+    processes  -- worker processes, defaults to every core. 1 renders in-process
+    chunk_size -- consecutive frames per task, defaults to ~4 tasks per worker
+                  (at most 30 frames)
+    trails     -- lines plotted with all their data, revealed up to point i in
+                  frame i. animate then only updates the artists created
+                  with animated=True, see the module docstring
+    """
+    workers = processes or os.cpu_count()
+    chunk_size = chunk_size or max(1, min(30, -(-frames // (4*workers))))
+    chunks = [range(lo, min(lo + chunk_size, frames)) for lo in range(0, frames, chunk_size)]
+    jobs = ((_render, (chunk,)) for chunk in chunks)
+    if trails is None:
+        _pipe(fig, animate, jobs, filename, fps, processes)
+        return
+
+    # blit on an Agg canvas, and put fig back the way it was afterwards.
+    # the trails and what covers them are animated, i.e. not in the background
+    canvas = fig.canvas
+    trails = _redraw_order(fig, trails)
+    animated = [line.get_animated() for line in trails]
+    layers = trails
+    capstyles = [line.get_solid_capstyle() for line in trails]
+    data = [(line, *map(np.asarray, line.get_data(orig=True))) for line in trails]
+    try:
+        FigureCanvasAgg(fig)
+        overlays = _overlays(fig, trails + fig.findobj(lambda a: a.get_animated()))
+        layers = trails + overlays
+        animated += [artist.get_animated() for artist in overlays]
+        for artist in layers:
+            artist.set_animated(True)
+        # round caps make the segments add up to the round joins of the whole line
+        for line in trails:
+            line.set_solid_capstyle('round')
+        _pipe(fig, animate, jobs, filename, fps, processes, data)
+    finally:
+        fig.set_canvas(canvas)
+        for (line, x, y), capstyle in zip(data, capstyles):
+            line.set_data(x, y)
+            line.set_solid_capstyle(capstyle)
+        for artist, flag in zip(layers, animated):
+            artist.set_animated(flag)
+
+
+def save_stream(fig, draw, chunks, filename, fps=30, processes=None):
+    """Render a solution chunk by chunk as it is integrated, and encode it.
+
+    draw   -- draw(t, y) updates fig for one frame: time t and state y, e.g.
+              y[0] is theta (or every member's theta for an ensemble)
+    chunks -- (t, y) windows of frames, e.g. from stream.iter_solve_ivp or
+              ensemble.iter_ensemble
+
+    Every chunk goes to a worker as soon as it is integrated, at most 2 per
+    worker are waiting, and a finished chunk is dropped once it is encoded.
+    """
+    _pipe(fig, draw, ((_render_states, chunk) for chunk in chunks), filename, fps, processes)
+
+
+def write_video(frames, filename, fps=30):
+    """Encode images that are already drawn, e.g. raster.Framebuffer.image.
+
+    frames -- iterable of (height, width, 3) uint8 rgb images, e.g. a
+              generator that draws each one as it is needed
+    """
+    ffmpeg = None
+    try:
+        for image in frames:
+            if ffmpeg is None:
+                size = (image.shape[1], image.shape[0])
+                ffmpeg = subprocess.Popen(ffmpeg_command(filename, size, fps, 'rgb24'), stdin=subprocess.PIPE)
+            ffmpeg.stdin.write(np.ascontiguousarray(image, dtype=np.uint8).tobytes())
+    finally:
+        if ffmpeg is not None:
+            ffmpeg.stdin.close()
+            ffmpeg.wait()
+
+    if ffmpeg is not None and ffmpeg.returncode:
+        raise RuntimeError(f'ffmpeg exited with code {ffmpeg.returncode} while writing {filename}')
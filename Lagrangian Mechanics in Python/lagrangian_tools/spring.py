@@ -0,0 +1,50 @@
+"""Zig-zag spring drawings for the spring mass and elastic pendulum videos.
+
+The animations used to push a 3 x (n+2) homogeneous copy of the spring
+through a fresh Affine2D().scale(...).rotate(...) every frame. A spring is
+only ever stretched along its axis, squeezed across it and rotated about
+the pivot, so spring_polylines applies that transform to every frame of a
+trajectory at once and the animation just picks row i.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+
+@lru_cache(maxsize=None)
+def generate_spring(n):
+    """A spring with "n" interior points, from (0,0) to (0,-1).
+
+    The spring has a width of 2/(2n) and a height of 1. Returns
+    data = [[x0 x1 ... x_n+1], [y0 y1 ... y_n+1]], shared between callers
+    (read-only).
+    """
+    i = np.arange(1, n+1)
+    data = np.zeros((2, n+2))
+    data[0,1:-1] = np.where(i % 2, -1, 1)/(2*n)
+    data[1,1:-1] = -(2*i-1)/(2*n)
+    data[1,-1] = -1
+    data.flags.writeable = False
+    return data
+
+
+def spring_polylines(n, length, thickness, angle=0):
+    """Vertices of the spring for every frame, from the pivot at (0,0).
+
+    length    -- spring length, a number or an array with one per frame
+    thickness -- the spring is scaled by thickness/length across its axis,
+                 so it gets thinner as it stretches
+    angle     -- rotation about the pivot (0 hangs straight down), a number
+                 or an array like length
+
+    Returns x, y of shape (*length.shape, n+2): x[i], y[i] is frame "i".
+    """
+    length = np.asarray(length, dtype=float)[..., None]
+    angle = np.asarray(angle, dtype=float)[..., None]
+    X, Y = generate_spring(n)
+
+    # scale, then rotate: the same as Affine2D().scale(thickness/length, length).rotate(angle)
+    xs = thickness/length*X
+    ys = length*Y
+    c, s = np.cos(angle), np.sin(angle)
+    return c*xs - s*ys, s*xs + c*ys
@@ -0,0 +1,54 @@
+"""Integrate and render long runs without keeping every frame in memory.
+
+The animation scripts solve first and keep all of sol.y around while they
+draw. That is fine for 10 s of one pendulum, but memory grows with tfinal
+and with the ensemble size. The generators here hand out the solution a
+window of frames at a time instead:
+
+    iter_solve_ivp -- one trajectory with an adaptive scipy solver
+    iter_ensemble  -- many trajectories at once, see ensemble.py
+
+and render.save_stream / render.write_video draw and encode each window as
+it arrives, so memory stays at one window whatever tfinal and N are.
+
+    chunks = iter_solve_ivp(kapitza_damped_ODE, t_eval, x0)
+    save_stream(fig, draw, chunks, 'kapitza_pendulum.gif', fps=30)
+"""
+import numpy as np
+import scipy.integrate
+
+
+def iter_solve_ivp(fun, t_eval, y0, chunk_size=300, method='RK45', args=(), **options):
+    """Like solve_ivp(fun, [t_eval[0], t_eval[-1]], y0, t_eval=t_eval, ...),
+    but yields the solution chunk_size frames at a time.
+
+    Yields (t, y) with t of shape (k,) and y of shape (n, k) like sol.y.
+    method and options (rtol, atol, max_step, jac, ...) are passed to the
+    scipy solver, e.g. method='LSODA'. The frames come from the solver's
+    dense output between steps, as in solve_ivp with t_eval.
+    """
+    t_eval = np.asarray(t_eval, dtype=float)
+    y0 = np.asarray(y0, dtype=float)
+    if args:
+        rhs = lambda t, y: fun(t, y, *args)
+    else:
+        rhs = fun
+    solver = getattr(scipy.integrate, method)(rhs, t_eval[0], y0, t_eval[-1], **options)
+
+    # frames that are solved but not handed out yet, starting with y0
+    t_buffer, y_buffer = t_eval[:1], y0[:, None]
+    i = 1
+    while i < len(t_eval):
+        solver.step()
+        if solver.status == 'failed':
+            raise RuntimeError(f'{method} failed at t={solver.t}: {solver.message}')
+        j = len(t_eval) if solver.status == 'finished' else np.searchsorted(t_eval, solver.t, side='right')
+        if j > i:
+            t_buffer = np.concatenate([t_buffer, t_eval[i:j]])
+            y_buffer = np.concatenate([y_buffer, solver.dense_output()(t_eval[i:j])], axis=1)
+            i = j
+        while len(t_buffer) >= chunk_size:
+            yield t_buffer[:chunk_size], y_buffer[:, :chunk_size]
+            t_buffer, y_buffer = t_buffer[chunk_size:], y_buffer[:, chunk_size:]
+    if len(t_buffer):
+        yield t_buffer, y_buffer
@@ -0,0 +1,118 @@
+"""Run one ODE over a whole grid of parameters and initial conditions.
+
+The grid is cut into shards, every shard is integrated as an ensemble (see
+ensemble.py) in its own worker process, and the results are written into a
+single (N, n, F) array as the shards finish. Pass a filename to back that
+array with a .npy file on disk instead of memory.
+
+The right-hand side takes its constants as arguments, like the generated
+*_rhs.py modules do, e.g.
+
+    from kapitza_rhs import kapitza_damped_rhs
+    a, w = grid(a_values, w_values)
+    result = sweep(kapitza_damped_rhs, t_eval, [0.1, 0], args=(m, g, ell, a, w, b))
+
+Worker processes import fun by name, so it has to live in a module (not a
+notebook cell) on Windows and macOS.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from .ensemble import solve_ensemble
+
+
+class SweepResult():
+    """Output of sweep. y has shape (N, n, F), one row per grid point.
+
+    With events, t_stop, t_events and i_events are as in EnsembleSolution,
+    with i_events counting grid points. Otherwise they are None.
+    """
+    def __init__(self, t, y, x0, args, t_stop=None, t_events=None, i_events=None):
+        self.t = t
+        self.y = y
+        self.x0 = x0
+        self.args = args
+        self.t_stop = t_stop
+        self.t_events = t_events
+        self.i_events = i_events
+
+
+def grid(*axes):
+    """Every combination of the given 1D axes, flattened.
+
+        a, w = grid(a_values, w_values)
+
+    gives len(a_values)*len(w_values) points, with the last axis varying
+    fastest, so results reshape to (len(a_values), len(w_values)).
+    """
+    return [A.ravel() for A in np.meshgrid(*axes, indexing='ij')]
+
+
+def _shard(args, lo, hi):
+    return tuple(a[lo:hi] if np.ndim(a) else a for a in args)
+
+
+def _solve_shard(fun, t_eval, x0, args, substeps, events):
+    sol = solve_ensemble(fun, t_eval, x0, substeps, args, events)
+    if not events:
+        return sol.y, None
+    return sol.y, (sol.t_stop, sol.t_events, sol.i_events)
+
+
+def sweep(fun, t_eval, x0, args=(), substeps=4, processes=None, shard_size=None, filename=None, events=None):
+    """Solve fun(t, y, *args) for every grid point.
+
+    x0         -- one initial condition (n,) shared by every point, or (N, n)
+    args       -- constants for fun, each a number or an array of shape (N,)
+    events     -- optional events, see events.py. A grid point that hits a
+                  terminal event stops costing work, its later frames are NaN
+    processes  -- worker processes, defaults to every core. 1 runs in-process
+    shard_size -- grid points per task, defaults to ~4 tasks per worker
+    filename   -- optional .npy file to hold the results
+    """
+    t_eval = np.asarray(t_eval, dtype=float)
+    x0 = np.array(x0, dtype=float, ndmin=2)
+    N = max([len(x0)] + [np.size(a) for a in args if np.ndim(a)])
+    x0 = np.broadcast_to(x0, (N, x0.shape[1]))
+
+    shape = (N, x0.shape[1], len(t_eval))
+    if filename is None:
+        y = np.empty(shape)
+    else:
+        y = np.lib.format.open_memmap(filename, mode='w+', dtype=float, shape=shape)
+
+    processes = processes or os.cpu_count()
+    shard_size = shard_size or max(1, -(-N // (4*processes)))
+    shards = [(lo, min(lo + shard_size, N)) for lo in range(0, N, shard_size)]
+
+    t_stop = np.full(N, np.inf)
+    found = [([], []) for _ in events or []] # times, grid points
+
+    def save(lo, hi, result):
+        y[lo:hi], stops = result
+        if stops is not None:
+            t_stop[lo:hi] = stops[0]
+            for (times, points), t_events, i_events in zip(found, stops[1], stops[2]):
+                times.append(t_events)
+                points.append(i_events + lo)
+
+    if processes == 1:
+        for lo, hi in shards:
+            save(lo, hi, _solve_shard(fun, t_eval, x0[lo:hi], _shard(args, lo, hi), substeps, events))
+    else:
+        with ProcessPoolExecutor(processes) as pool:
+            futures = {pool.submit(_solve_shard, fun, t_eval, x0[lo:hi], _shard(args, lo, hi), substeps, events): (lo, hi)
+                       for lo, hi in shards}
+            for future in as_completed(futures):
+                lo, hi = futures[future]
+                save(lo, hi, future.result())
+
+    if filename is not None:
+        y.flush()
+    if not events:
+        return SweepResult(t_eval, y, x0, args)
+    t_events = [np.concatenate(times) for times, _ in found]
+    i_events = [np.concatenate(points) for _, points in found]
+    return SweepResult(t_eval, y, x0, args, t_stop, t_events, i_events)
@@ -0,0 +1,177 @@
+"""Save simulation results in a binary format that is quick to write and read.
+
+A trajectory is a directory, e.g. pend.traj/, holding
+
+    meta.json    -- system name, params, x0, solver settings, column names
+    t.f64        -- the time grid
+    theta.f64    -- one raw little-endian float64 file per state
+    ...
+
+Each column is stored frame by frame: (frames,) for a single solve and
+(frames, N) for an ensemble of N members. Adding frames only appends to the
+end of every file, so long runs can be written in chunks as they are
+integrated, and picked up again later with TrajectoryWriter(..., append=True).
+Reading memory-maps the files, so nothing is parsed or copied until it is
+used.
+
+    save_trajectory('pend.traj', sol.t, sol.y, ['theta', 'theta_dot'],
+        system='simple pendulum', params={'g': g, 'ell': ell}, x0=x0)
+    traj = load_trajectory('pend.traj')
+    traj['theta'], traj.t, traj.meta['params']['g']
+"""
+import json
+import os
+
+import numpy as np
+
+DTYPE = np.dtype('<f8')
+
+
+def _jsonable(value):
+    # numpy numbers and arrays (e.g. per-member params) -> plain json
+    if isinstance(value, dict):
+        return {str(k): _jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    if isinstance(value, (np.ndarray, np.generic)):
+        return value.tolist()
+    return value
+
+
+def _frames(path, columns, members):
+    # frames that every file holds in full (a writer may be mid-chunk)
+    row = DTYPE.itemsize*(1 if members is None else members)
+    return min([os.path.getsize(os.path.join(path, 't.f64')) // DTYPE.itemsize] +
+               [os.path.getsize(os.path.join(path, name + '.f64')) // row for name in columns])
+
+
+class TrajectoryWriter():
+    """Write a trajectory in chunks.
+
+    path    -- directory to write to
+    columns -- state names, in the order of the rows of y
+    members -- ensemble size N, or None for a single solve
+    append  -- False to start over (the directory's old .f64 files are
+               removed), True to add frames to the trajectory already in
+               path. Its meta.json has to match the arguments then, or a
+               ValueError is raised. A chunk that an interrupted writer left
+               half written is dropped first.
+    the rest is stored in meta.json as is, e.g. system='kapitza pendulum',
+    params={'g': 9.81, ...}, x0=x0, solver={'method': 'RK45', 'rtol': 1e-3}
+
+        with TrajectoryWriter('run.traj', ['theta', 'theta_dot']) as traj:
+            traj.append(sol.t, sol.y)
+    """
+    def __init__(self, path, columns, members=None, system='', params=None, x0=None, solver=None,
+                 append=False):
+        self.path = path
+        self.columns = list(columns)
+        self.members = members
+        os.makedirs(path, exist_ok=True)
+
+        meta = {
+            'system': system,
+            'columns': self.columns,
+            'members': members,
+            'params': _jsonable(params or {}),
+            'x0': _jsonable(x0),
+            'solver': _jsonable(solver or {}),
+        }
+        # through json, so that tuples compare equal to the lists read back
+        meta = json.loads(json.dumps(meta))
+        meta_file = os.path.join(path, 'meta.json')
+        if append and os.path.exists(meta_file):
+            with open(meta_file) as file:
+                if json.load(file) != meta:
+                    raise ValueError(f'{path} holds a different trajectory, see its meta.json')
+            frames = _frames(path, self.columns, members)
+            row = DTYPE.itemsize*(1 if members is None else members)
+            os.truncate(os.path.join(path, 't.f64'), DTYPE.itemsize*frames)
+            for name in self.columns:
+                os.truncate(os.path.join(path, name + '.f64'), row*frames)
+            mode = 'ab'
+        else:
+            for name in os.listdir(path):
+                if name.endswith('.f64'):
+                    os.remove(os.path.join(path, name))
+            with open(meta_file, 'w') as file:
+                json.dump(meta, file, indent=1)
+            mode = 'wb'
+
+        self._files = {name: open(os.path.join(path, name + '.f64'), mode) for name in ['t'] + self.columns}
+
+    def append(self, t, y):
+        """Add the frames t (k,) with states y, laid out like solve_ivp's
+        sol.y (n, k), or like an ensemble's sol.y (N, n, k)."""
+        y = np.asarray(y, dtype=float)
+        if y.shape[-2:] != (len(self.columns), len(t)):
+            raise ValueError(f'expected y of shape (..., {len(self.columns)}, {len(t)}), got {y.shape}')
+
+        self._files['t'].write(np.asarray(t, dtype=DTYPE).tobytes())
+        for j, name in enumerate(self.columns):
+            # frame-major: (k,) or (k, N)
+            self._files[name].write(np.ascontiguousarray(y[..., j, :].T, dtype=DTYPE).tobytes())
+
+    def close(self):
+        for file in self._files.values():
+            file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def save_trajectory(path, t, y, columns, **meta):
+    """Write a whole solution at once, see TrajectoryWriter for the arguments."""
+    y = np.asarray(y)
+    members = y.shape[0] if y.ndim == 3 else None
+    with TrajectoryWriter(path, columns, members=members, **meta) as traj:
+        traj.append(t, y)
+
+
+class Trajectory():
+    """A trajectory on disk, see load_trajectory.
+
+    meta       -- the contents of meta.json
+    t          -- the time grid, (frames,)
+    traj[name] -- one state, (frames,) or (frames, N) for an ensemble
+    """
+    def __init__(self, path, mmap=True):
+        self.path = path
+        self.mmap = mmap
+        with open(os.path.join(path, 'meta.json')) as file:
+            self.meta = json.load(file)
+        self.columns = self.meta['columns']
+        self._shape = () if self.meta['members'] is None else (self.meta['members'],)
+
+        self.frames = _frames(path, self.columns, self.meta['members'])
+        self.t = self._read('t', ())
+
+    def _filename(self, name):
+        return os.path.join(self.path, name + '.f64')
+
+    def _read(self, name, shape):
+        shape = (self.frames,) + shape
+        if self.frames == 0:
+            return np.empty(shape, dtype=DTYPE)
+        if self.mmap:
+            return np.memmap(self._filename(name), dtype=DTYPE, mode='r', shape=shape)
+        return np.fromfile(self._filename(name), dtype=DTYPE, count=int(np.prod(shape))).reshape(shape)
+
+    def __getitem__(self, name):
+        if name not in self.columns:
+            raise KeyError(name)
+        return self._read(name, self._shape)
+
+    @property
+    def y(self):
+        """All states stacked like sol.y, (n, frames) or (N, n, frames). A copy."""
+        return np.stack([np.moveaxis(self[name], 0, -1) for name in self.columns], axis=-2)
+
+
+def load_trajectory(path, mmap=True):
+    """Open a trajectory written by save_trajectory or TrajectoryWriter.
+    With mmap=False the columns are read into memory instead."""
+    return Trajectory(path, mmap)
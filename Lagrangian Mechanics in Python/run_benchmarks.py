@@ -0,0 +1,326 @@
+"""Fixed workloads for every system and every stage of making a video.
+
+    python run_benchmarks.py                               # everything -> benchmark.json
+    python run_benchmarks.py --systems kapitza --stages solve ensemble
+    python run_benchmarks.py --compare old_benchmark.json  # exit code 1 if anything got worse
+
+use --repeat 5 (fastest of 5 runs) for comparisons, short stages are noisy.
+
+stages:
+    derivation -- the whole derivation script, with an empty sympy cache, run
+                  in a temporary folder
+    solve      -- one solve_ivp run at the default tolerances
+    ensemble   -- 1000 members at once with solve_ensemble
+    frames     -- drawing 300 frames (matplotlib, or raster.Framebuffer for
+                  the double pendulum ensemble video)
+    encode     -- piping those 300 frames through ffmpeg into an .mp4
+
+Each result has wall time, right-hand side calls and peak memory, see
+lagrangian_tools/benchmark.py.
+"""
+import argparse
+import os
+import runpy
+import shutil
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+from matplotlib.colors import hsv_to_rgb
+from matplotlib.lines import Line2D
+from scipy.integrate import solve_ivp
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(HERE)
+from lagrangian_tools import cache
+from lagrangian_tools.benchmark import CallCounter, compare_results, load_results, measure, save_results
+from lagrangian_tools.ensemble import solve_ensemble
+from lagrangian_tools.kinematics import chain_positions
+from lagrangian_tools.raster import Framebuffer, to_rgb8
+from lagrangian_tools.render import ffmpeg_command, render_frames
+from lagrangian_tools.spring import spring_polylines
+
+# the generated right-hand sides
+for folder in ['Simple Pendulum', 'Spring Mass', 'Elastic Pendulum', 'Kapitza Pendulum', 'Double Pendulum']:
+    sys.path.append(os.path.join(HERE, folder))
+from pendulum_rhs import pendulum_rhs
+from spring_mass_rhs import spring_mass_rhs
+from elastic_rhs import elastic_pend_rhs
+from kapitza_rhs import kapitza_damped_rhs
+from compound_rhs import double_compound_pend_rhs
+
+SYSTEMS = ['simple', 'spring', 'elastic', 'kapitza', 'double']
+STAGES = ['derivation', 'solve', 'ensemble', 'frames', 'encode']
+FRAMES = 300
+N = 1000
+
+# (system, stage) -> (workload description, setup). setup() does the
+# untimed preparation and returns run(), the part that is measured
+BENCHMARKS = {}
+
+
+#### the systems, with the constants of their animation scripts ####
+
+g = 9.81
+fps = 30
+
+# simple pendulum
+ell = 1
+simple = dict(fun=pendulum_rhs, args=(g, ell), x0=[np.deg2rad(30), 0], tfinal=10,
+    x0s=np.c_[np.linspace(0.01, 3.1, N), np.zeros(N)])
+
+# spring mass
+m, k, b = 1, 20, 0.25
+spring = dict(fun=spring_mass_rhs, args=(m, g, k, b), x0=[-1, 0], tfinal=10,
+    x0s=np.c_[np.linspace(-2, 0, N), np.zeros(N)])
+
+# elastic pendulum
+ell_0 = 1
+elastic = dict(fun=elastic_pend_rhs, args=(m, g, k, ell_0), x0=[np.deg2rad(15), 0, 0.25, 0], tfinal=10,
+    x0s=np.c_[np.linspace(0, 1, N), np.zeros(N), np.full(N, 0.25), np.zeros(N)])
+
+# kapitza pendulum: 2 s at 20x slow motion
+a, w, b_kapitza = 0.1, 2*np.pi*40, 3
+kapitza = dict(fun=kapitza_damped_rhs, args=(m, g, ell, a, w, b_kapitza), x0=[0.1, 0], tfinal=2, fps=30*20,
+    x0s=np.c_[np.linspace(-0.5, 0.5, N), np.zeros(N)])
+
+# compound double pendulum
+double = dict(fun=double_compound_pend_rhs, args=(g,), x0=[np.pi/3, 0, np.pi/2, 0], tfinal=10,
+    x0s=np.array([[np.pi/3, 0, np.pi/2+np.deg2rad(0.5)*i/N, 0] for i in range(N)]))
+
+MODELS = {'simple': simple, 'spring': spring, 'elastic': elastic, 'kapitza': kapitza, 'double': double}
+DERIVATIONS = {
+    'simple': ('Simple Pendulum', 'model_simple_pendulum.py'),
+    'spring': ('Spring Mass', 'derive_spring_mass.py'),
+    'elastic': ('Elastic Pendulum', 'derivation.py'),
+    'kapitza': ('Kapitza Pendulum', 'derivation.py'),
+    'double': ('Double Pendulum', 'compound_derivation.py'),
+}
+
+
+def t_eval(model):
+    rate = model.get('fps', fps)
+    return np.linspace(0, model['tfinal'], model['tfinal']*rate + 1)
+
+
+def solve(model):
+    sol = solve_ivp(model['fun'], [0, model['tfinal']], model['x0'], t_eval=t_eval(model), args=model['args'])
+    return sol.t, sol.y
+
+
+#### derivation, solve and ensemble: the same for every system ####
+
+def derivation_setup(system):
+    folder, script = DERIVATIONS[system]
+
+    def run():
+        # a copy in a temporary folder with a cold cache, so the *_rhs.py
+        # files it writes never touch the ones in the repo
+        cwd = os.getcwd()
+        old_cache = cache.CACHE_DIR
+        with tempfile.TemporaryDirectory() as tmp:
+            shutil.copy(os.path.join(HERE, folder, script), tmp)
+            cache.CACHE_DIR = os.path.join(tmp, 'cache')
+            os.chdir(tmp)
+            try:
+                runpy.run_path(script, run_name='__main__')
+            finally:
+                os.chdir(cwd)
+                cache.CACHE_DIR = old_cache
+    return run
+
+
+def solve_setup(system):
+    model = MODELS[system]
+
+    def run():
+        rhs = CallCounter(model['fun'])
+        solve_ivp(rhs, [0, model['tfinal']], model['x0'], t_eval=t_eval(model), args=model['args'])
+        return rhs.calls
+    return run
+
+
+def ensemble_setup(system):
+    model = MODELS[system]
+
+    def run():
+        return solve_ensemble(model['fun'], t_eval(model), model['x0s'], args=model['args']).nfev
+    return run
+
+
+for system in SYSTEMS:
+    folder, script = DERIVATIONS[system]
+    model = MODELS[system]
+    duration = f"{model['tfinal']} s at {model.get('fps', fps)} fps"
+    BENCHMARKS[system, 'derivation'] = (f'{folder}/{script}', lambda system=system: derivation_setup(system))
+    BENCHMARKS[system, 'solve'] = (f'solve_ivp RK45, {duration}', lambda system=system: solve_setup(system))
+    BENCHMARKS[system, 'ensemble'] = (f'solve_ensemble RK4 x4, {N} members, {duration}', lambda system=system: ensemble_setup(system))
+
+
+#### frames: one figure per system, like its animation ####
+
+def figure(lim):
+    fig = plt.figure()
+    ax = fig.add_subplot(aspect='equal')
+    ax.set_xlim(-lim, lim)
+    ax.set_ylim(-lim, lim)
+    ax.set_xticks([])
+    ax.set_yticks([])
+    return fig, ax
+
+
+def pendulum_frames():
+    t, y = solve(simple)
+    x, yy = chain_positions([y[0]], ell)
+    fig, ax = figure(1.5)
+    rod = ax.add_line(Line2D(x[:,0], yy[:,0], color='k', linewidth=3))
+    bob = ax.add_patch(plt.Circle((x[1,0], yy[1,0]), 0.1, fc='r', zorder=3))
+
+    def animate(i):
+        rod.set_data(x[:,i], yy[:,i])
+        bob.set_center((x[1,i], yy[1,i]))
+    return fig, animate
+
+
+def spring_frames():
+    t, y = solve(spring)
+    xn, yn = spring_polylines(30, 2 + y[0], 8) # unstretched length 2
+    fig, ax = figure(3)
+    line = ax.add_line(Line2D(xn[0], yn[0], color='k'))
+    mass = ax.add_patch(plt.Circle((0, yn[0,-1]), 0.25, fc='b', zorder=3))
+
+    def animate(i):
+        line.set_data(xn[i], yn[i])
+        mass.set_center((0, yn[i,-1]))
+    return fig, animate
+
+
+def elastic_frames():
+    t, y = solve(elastic)
+    xn, yn = spring_polylines(30, ell_0 + y[2], 2, y[0])
+    fig, ax = figure(2)
+    line = ax.add_line(Line2D(xn[0], yn[0], color='k'))
+    bob = ax.add_patch(plt.Circle((xn[0,-1], yn[0,-1]), 0.1, fc='r', zorder=3))
+
+    def animate(i):
+        line.set_data(xn[i], yn[i])
+        bob.set_center((xn[i,-1], yn[i,-1]))
+    return fig, animate
+
+
+def kapitza_frames():
+    t, y = solve(kapitza)
+    pivot = a*np.sin(w*t)
+    x, yy = ell*np.sin(y[0]), pivot + ell*np.cos(y[0])
+    fig, ax = figure(1.5)
+    rod = ax.add_line(Line2D([0, x[0]], [pivot[0], yy[0]], color='k', linewidth=3))
+    bob = ax.add_patch(plt.Circle((x[0], yy[0]), 0.1, fc='r', zorder=3))
+
+    def animate(i):
+        rod.set_data([0, x[i]], [pivot[i], yy[i]])
+        bob.set_center((x[i], yy[i]))
+    return fig, animate
+
+
+MATPLOTLIB_FRAMES = {'simple': pendulum_frames, 'spring': spring_frames, 'elastic': elastic_frames, 'kapitza': kapitza_frames}
+
+
+def frame_source(system):
+    """frames() yielding the raw bytes of each of the FRAMES frames in turn,
+    their size and ffmpeg pixel format."""
+    if system != 'double':
+        fig, animate = MATPLOTLIB_FRAMES[system]()
+        size = [int(x) for x in fig.get_size_inches()*fig.dpi]
+
+        def frames():
+            for i in range(FRAMES):
+                yield render_frames(fig, animate, [i])
+        return frames, size, 'rgba'
+
+    # the 1000 double pendulum video of compound_animate.py
+    sol = solve_ensemble(double['fun'], t_eval(double), double['x0s'], args=double['args'])
+    x, y = chain_positions([sol.y[:,0].T, sol.y[:,2].T])
+    fb = Framebuffer(1920, 1080, xlim=(-19.2/7, 19.2/7), ylim=(-10.8/7-0.8, 10.8/7-0.8))
+    rainbow = to_rgb8(hsv_to_rgb([(i/N,1,1) for i in range(N)]))
+
+    def frames():
+        for i in range(FRAMES):
+            fb.clear()
+            fb.draw_segments(x[:-1,i].ravel(), y[:-1,i].ravel(), x[1:,i].ravel(), y[1:,i].ravel(), np.r_[rainbow, rainbow])
+            yield fb.image.tobytes()
+    return frames, (1920, 1080), 'rgb24'
+
+
+def frames_setup(system):
+    frames, size, pix_fmt = frame_source(system)
+
+    def run():
+        for frame in frames():
+            pass # drawn and dropped, like a video that streams into ffmpeg
+    return run
+
+
+def encode_setup(system):
+    # draw the frames into a file first, so only ffmpeg is timed
+    frames, size, pix_fmt = frame_source(system)
+    raw = tempfile.TemporaryFile()
+    for frame in frames():
+        raw.write(frame)
+
+    def run():
+        with tempfile.TemporaryDirectory() as folder:
+            raw.seek(0)
+            filename = os.path.join(folder, f'{system}.mp4')
+            subprocess.run(ffmpeg_command(filename, size, fps, pix_fmt), stdin=raw, check=True)
+    return run
+
+
+for system in SYSTEMS:
+    what = f'{N} double pendulums, 1920x1080 Framebuffer' if system == 'double' else 'matplotlib savefig'
+    BENCHMARKS[system, 'frames'] = (f'{FRAMES} frames, {what}', lambda system=system: frames_setup(system))
+    BENCHMARKS[system, 'encode'] = (f'{FRAMES} frames, ffmpeg h264, {what}', lambda system=system: encode_setup(system))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark every stage of every system.')
+    parser.add_argument('--systems', nargs='+', choices=SYSTEMS, default=SYSTEMS)
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=STAGES)
+    parser.add_argument('--out', default='benchmark.json', help='where to write the results')
+    parser.add_argument('--repeat', type=int, default=1, help='time every stage this many times, keep the fastest')
+    parser.add_argument('--no-memory', action='store_true', help='skip the (slower) traced runs for peak memory')
+    parser.add_argument('--compare', metavar='BASELINE', help='results of an earlier run to check against')
+    parser.add_argument('--tolerance', type=float, default=1.25, help='allowed slowdown before --compare complains')
+    options = parser.parse_args()
+
+    results = []
+    for system in options.systems:
+        for stage in options.stages:
+            workload, setup = BENCHMARKS[system, stage]
+            record = {'system': system, 'stage': stage, 'workload': workload}
+            try:
+                record.update(measure(setup(), memory=not options.no_memory, repeat=options.repeat))
+            except (OSError, subprocess.CalledProcessError) as error:
+                record['error'] = str(error) # e.g. ffmpeg is not installed
+            plt.close('all')
+            results.append(record)
+
+            peak = record.get('peak_bytes')
+            print(f"{system:8} {stage:10} " + (f"error: {record['error']}" if 'error' in record else
+                f"{record['wall_s']:8.3f} s  {record['rhs_calls'] or '-':>8} calls  " +
+                (f'{peak/2**20:8.1f} MiB' if peak is not None else '')))
+
+    save_results(options.out, results)
+
+    if options.compare:
+        worse = compare_results(load_results(options.compare), results, options.tolerance)
+        for record, metric, old, new in worse:
+            print(f"worse: {record['system']} {record['stage']} {metric} {old:.4g} -> {new:.4g}")
+        sys.exit(1 if worse else 0)
+
+
+if __name__ == '__main__':
+    main()